@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db import transaction
+from django.db.models import Case, Count, Prefetch, Q, Value, When
 from .models import (
     TimeSlot,
     Event,
@@ -8,11 +11,52 @@ from .models import (
     Donation,
     ConnectionRequest
 )
+from .keyboards import events_keyboard
+from .participants import participant_cache
+from .questions import enqueue_question
+from .search import participant_search, question_search
+from .snapshots import active_events
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр с полем ввода вместо списка всех вариантов"""
+    template = 'admin/events_bot/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Остальные параметры страницы (кроме номера) уходят в форму скрытыми полями
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'query_parts': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, PAGE_VAR)
+            ],
+        }
+
+
+class SpeakerFilter(InputFilter):
+    title = 'Спикер'
+    parameter_name = 'speaker_name'
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip().lstrip('@')
+        if not value:
+            return queryset
+        return queryset.filter(
+            Q(speaker__name__icontains=value) | Q(speaker__telegram_username__iexact=value)
+        )
 
 
 class SpeakerInline(admin.TabularInline):
     model = Speaker.events.through
     extra = 1
+    autocomplete_fields = ('speaker',)
     verbose_name = "Спикер"
     verbose_name_plural = "Спикеры мероприятия"
 
@@ -21,6 +65,7 @@ class TimeSlotInline(admin.TabularInline):
     model = TimeSlot
     extra = 1
     fields = ('speaker', 'title', 'start_time', 'end_time', 'description')
+    autocomplete_fields = ('speaker',)
     ordering = ('start_time',)
     verbose_name = "Временной слот"
     verbose_name_plural = "Расписание выступлений"
@@ -34,31 +79,78 @@ class EventAdmin(admin.ModelAdmin):
     inlines = [SpeakerInline, TimeSlotInline]
     date_hierarchy = 'date'
     list_per_page = 20
+    actions = ['archive_events']
+
+    def get_queryset(self, request):
+        # Спикеры всех мероприятий на странице - одним запросом
+        return super().get_queryset(request).prefetch_related(
+            Prefetch('speakers', queryset=Speaker.objects.only('id', 'name'))
+        )
 
     def speakers_list(self, obj):
         return ", ".join([speaker.name for speaker in obj.speakers.all()])
     speakers_list.short_description = 'Спикеры'
 
+    @admin.action(description="Перенести в архив (сделать неактивными)")
+    def archive_events(self, request, queryset):
+        updated = queryset.filter(is_active=True).update(is_active=False)
+        # update() не вызывает сигналы - сбрасываем кэши один раз на всю пачку
+        transaction.on_commit(events_keyboard.invalidate)
+        transaction.on_commit(active_events.invalidate)
+        self.message_user(request, f"Перенесено в архив: {updated}")
+
 
 @admin.register(Speaker)
 class SpeakerAdmin(admin.ModelAdmin):
     list_display = ('name', 'telegram_username', 'telegram_id', 'events_count')
     search_fields = ('name', 'telegram_username', 'telegram_id')
     list_per_page = 20
-    filter_horizontal = ('events',)
+    autocomplete_fields = ('events',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(events_total=Count('events'))
 
     def events_count(self, obj):
-        return obj.events.count()
+        return obj.events_total
     events_count.short_description = 'Мероприятий'
+    events_count.admin_order_field = 'events_total'
 
 
 @admin.register(Participant)
 class ParticipantAdmin(admin.ModelAdmin):
     list_display = ('name', 'telegram_username', 'is_speaker', 'is_event_manager', 'is_subscribed', 'has_profile')
     list_filter = ('is_speaker', 'is_event_manager', 'is_subscribed')
-    search_fields = ('name', 'telegram_username', 'telegram_id')
+    search_fields = ('name', '=telegram_username', '=telegram_id')
     list_per_page = 20
-    filter_horizontal = ('registered_events',)
+    autocomplete_fields = ('registered_events',)
+    actions = ['subscribe', 'unsubscribe']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Имя и «О себе» ищутся по полнотекстовому индексу, username и ID - точно"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        found = participant_search.filter(queryset, search_term)
+        found |= queryset.filter(telegram_username__iexact=search_term.lstrip('@'))
+        if search_term.isdigit():
+            found |= queryset.filter(telegram_id=int(search_term))
+        return found, False
+
+    def _set_subscribed(self, queryset, is_subscribed):
+        telegram_ids = list(queryset.values_list('telegram_id', flat=True))
+        updated = queryset.update(is_subscribed=is_subscribed)
+        participant_cache.invalidate_many(telegram_ids)
+        return updated
+
+    @admin.action(description="Подписать на рассылку")
+    def subscribe(self, request, queryset):
+        updated = self._set_subscribed(queryset, True)
+        self.message_user(request, f"Подписано: {updated}")
+
+    @admin.action(description="Отписать от рассылки")
+    def unsubscribe(self, request, queryset):
+        updated = self._set_subscribed(queryset, False)
+        self.message_user(request, f"Отписано: {updated}")
 
     def has_profile(self, obj):
         return obj.has_profile
@@ -69,8 +161,11 @@ class ParticipantAdmin(admin.ModelAdmin):
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('short_text', 'speaker', 'participant', 'timestamp', 'is_answered', 'event')
-    list_filter = ('is_answered', 'speaker', 'event')
-    search_fields = ('text', 'speaker__name', 'participant__name')
+    list_filter = ('is_answered', SpeakerFilter, 'event')
+    search_fields = ('text',)
+    list_select_related = ('speaker', 'participant', 'event')
+    autocomplete_fields = ('event', 'speaker', 'participant')
+    actions = ['mark_answered', 'resend_to_speaker']
     list_editable = ('is_answered',)
     readonly_fields = ('timestamp',)
     list_per_page = 20
@@ -86,6 +181,34 @@ class QuestionAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        """Текст вопроса и имя участника ищутся по полнотекстовому индексу"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        found = question_search.filter(queryset, search_term)
+        found |= queryset.filter(speaker__in=Speaker.objects.filter(name__icontains=search_term))
+        found |= queryset.filter(
+            participant__in=participant_search.filter(Participant.objects.all(), search_term)
+        )
+        return found, False
+
+    @admin.action(description="Отметить отвеченными")
+    def mark_answered(self, request, queryset):
+        updated = queryset.filter(is_answered=False).update(is_answered=True)
+        self.message_user(request, f"Отмечено отвеченными: {updated}")
+
+    @admin.action(description="Отправить спикеру повторно")
+    def resend_to_speaker(self, request, queryset):
+        question_ids = list(queryset.values_list('id', flat=True))
+        Question.objects.filter(id__in=question_ids).update(is_delivered=False, delivery_claimed_until=None)
+
+        def enqueue():
+            for question_id in question_ids:
+                enqueue_question(question_id)
+        transaction.on_commit(enqueue)
+        self.message_user(request, f"Поставлено в очередь на отправку: {len(question_ids)}")
+
     def short_text(self, obj):
         return f"{obj.text[:50]}..." if len(obj.text) > 50 else obj.text
     short_text.short_description = 'Текст вопроса'
@@ -93,8 +216,10 @@ class QuestionAdmin(admin.ModelAdmin):
 
 @admin.register(Donation)
 class DonationAdmin(admin.ModelAdmin):
-    list_display = ('participant', 'amount', 'timestamp', 'is_confirmed', 'event')
-    list_filter = ('event', 'is_confirmed')
+    list_display = ('participant', 'amount', 'timestamp', 'is_confirmed', 'is_canceled', 'event')
+    list_filter = ('event', 'is_confirmed', 'is_canceled')
+    list_select_related = ('participant', 'event')
+    autocomplete_fields = ('participant', 'event')
     search_fields = ('participant__name', 'payment_id')
     list_per_page = 20
     date_hierarchy = 'timestamp'
@@ -103,8 +228,20 @@ class DonationAdmin(admin.ModelAdmin):
 @admin.register(TimeSlot)
 class TimeSlotAdmin(admin.ModelAdmin):
     list_display = ('event', 'speaker', 'start_time', 'end_time', 'title', 'is_extended')
-    list_filter = ('event', 'speaker')
+    list_filter = ('event', SpeakerFilter)
     search_fields = ('title', 'speaker__name')
+    list_select_related = ('event', 'speaker')
+    autocomplete_fields = ('event', 'speaker')
     list_per_page = 20
     date_hierarchy = 'start_time'
     list_editable = ('is_extended',)
+    actions = ['toggle_extended']
+
+    @admin.action(description="Переключить «Выступление продлено»")
+    def toggle_extended(self, request, queryset):
+        updated = queryset.update(is_extended=Case(
+            When(is_extended=True, then=Value(False)),
+            default=Value(True)
+        ))
+        transaction.on_commit(active_events.invalidate)
+        self.message_user(request, f"Изменено слотов: {updated}")
@@ -0,0 +1,26 @@
+from threading import Lock
+
+from django.conf import settings
+from telegram.ext import ExtBot
+from telegram.utils.request import Request
+
+_bot = None
+_bot_lock = Lock()
+
+
+def get_bot():
+    """Общий для процесса клиент Telegram Bot API.
+
+    Создаётся один раз: пул соединений рассчитан на обработчики обновлений,
+    потоки рассылок и фоновые задачи одновременно.
+    """
+    global _bot
+    with _bot_lock:
+        if _bot is None:
+            pool_size = settings.TG_CHAT_WORKERS + settings.BROADCAST_WORKERS + 8
+            _bot = ExtBot(
+                settings.TG_BOT_TOKEN,
+                base_url=settings.TG_API_URL,
+                request=Request(con_pool_size=pool_size)
+            )
+    return _bot
@@ -0,0 +1,307 @@
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+from threading import BoundedSemaphore, Event, Lock, Thread
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+
+from events_bot.models import Broadcast, BroadcastDelivery
+
+DELIVERY_CHUNK_SIZE = 1000
+
+# pid после перезапуска контейнера повторяется, поэтому добавляем случайную метку
+_owner_token = uuid.uuid4().hex[:8]
+
+
+def lease_owner():
+    """Имя этого процесса в Broadcast.owner"""
+    return f'{socket.gethostname()}:{os.getpid()}:{_owner_token}'
+
+
+def lease_deadline():
+    return timezone.now() + timedelta(seconds=settings.DELIVERY_LEASE_TIMEOUT)
+
+
+def claim_broadcast(broadcast_id):
+    """Забирает рассылку одним UPDATE, если её аренда истекла; True, если рассылка наша"""
+    return bool(Broadcast.objects.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=timezone.now()),
+        pk=broadcast_id,
+        is_finished=False
+    ).update(owner=lease_owner(), lease_expires_at=lease_deadline()))
+
+
+class RateLimiter:
+    """Не больше rate запросов в секунду на все рассылки бота"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next_at = 0.0
+        self._lock = Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_at)
+            self._next_at = send_at + self.interval
+        if send_at > now:
+            time.sleep(send_at - now)
+
+    def pause(self, seconds):
+        """Telegram попросил подождать (RetryAfter) - останавливаем все отправки"""
+        with self._lock:
+            self._next_at = max(self._next_at, time.monotonic() + seconds)
+
+
+rate_limiter = RateLimiter(settings.BROADCAST_RATE)
+
+
+def send_with_retries(bot, chat_id, text, **kwargs):
+    """Отправляет сообщение с учётом лимита; возвращает текст ошибки или пустую строку"""
+    attempt = 0
+    while True:
+        rate_limiter.wait()
+        try:
+            bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            return ''
+        except RetryAfter as e:
+            rate_limiter.pause(e.retry_after)
+            continue
+        except BadRequest as e:
+            error = e
+        except NetworkError as e:
+            # Временная ошибка сети или таймаут - пробуем ещё раз с паузой
+            if attempt < settings.BROADCAST_MAX_RETRIES:
+                time.sleep(2 ** attempt)
+                attempt += 1
+                continue
+            error = e
+        except TelegramError as e:
+            # Бот заблокирован пользователем и т.п.
+            error = e
+        print(f"Не удалось отправить сообщение {chat_id}: {str(error)}")
+        return str(error) or error.__class__.__name__
+
+
+class BroadcastSender:
+    """Отправка рассылки в фоновом потоке по журналу BroadcastDelivery.
+
+    Ожидающие доставки читаются из БД порциями по id, сообщения отправляет
+    пул из BROADCAST_WORKERS потоков с общим ограничением скорости. Статус
+    каждой доставки записывается сразу после отправки, поэтому после
+    перезапуска рассылка продолжается с того же места.
+    Организатору периодически обновляется сообщение с прогрессом.
+
+    Рассылка должна быть арендована этим процессом (create_broadcast,
+    claim_broadcast). Пока отправка идёт, аренда продлевается; если её
+    забрал другой процесс, отправка останавливается.
+    """
+
+    def __init__(self, bot, broadcast, on_done=None):
+        self.bot = bot
+        self.broadcast = broadcast
+        self.on_done = on_done
+        counts = broadcast.get_status_counts()
+        self.sent = counts[BroadcastDelivery.Status.SENT]
+        self.failed = counts[BroadcastDelivery.Status.FAILED]
+        self.total = sum(counts.values())
+        self.finished = Event()
+        self._lease_lost = Event()
+        self._counter_lock = Lock()
+        self._last_progress_at = 0.0
+
+    def start(self):
+        Thread(target=self._run, name=f'broadcast_{self.broadcast.pk}', daemon=True).start()
+        Thread(target=self._keep_lease, name=f'broadcast_lease_{self.broadcast.pk}', daemon=True).start()
+        return self
+
+    def _keep_lease(self):
+        try:
+            while not self.finished.wait(settings.DELIVERY_LEASE_TIMEOUT / 3):
+                renewed = Broadcast.objects.filter(
+                    pk=self.broadcast.pk,
+                    owner=lease_owner(),
+                    is_finished=False
+                ).update(lease_expires_at=lease_deadline())
+                if not renewed:
+                    print(f"Рассылку #{self.broadcast.pk} отправляет другой процесс, останавливаемся")
+                    self._lease_lost.set()
+                    return
+        except Exception as e:
+            print(f"Не удалось продлить аренду рассылки #{self.broadcast.pk}: {str(e)}")
+        finally:
+            connection.close()
+
+    def _release(self, **fields):
+        Broadcast.objects.filter(pk=self.broadcast.pk, owner=lease_owner()).update(
+            lease_expires_at=None,
+            **fields
+        )
+
+    def _pending_deliveries(self):
+        pending = self.broadcast.deliveries.filter(
+            status=BroadcastDelivery.Status.PENDING
+        ).order_by('id')
+        last_id = 0
+        while True:
+            chunk = list(pending.filter(id__gt=last_id).values_list('id', 'telegram_id')[:DELIVERY_CHUNK_SIZE])
+            if not chunk:
+                return
+            yield from chunk
+            last_id = chunk[-1][0]
+
+    def _run(self):
+        workers = settings.BROADCAST_WORKERS
+        # Не держим в памяти больше получателей, чем успеваем отправить
+        in_flight = BoundedSemaphore(workers * 2)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for delivery_id, chat_id in self._pending_deliveries():
+                    in_flight.acquire()
+                    if self._lease_lost.is_set():
+                        return
+                    future = pool.submit(self._deliver, delivery_id, chat_id)
+                    future.add_done_callback(partial(self._delivery_done, in_flight, delivery_id))
+                    self._report_progress()
+            if self._lease_lost.is_set():
+                return
+            if self.broadcast.deliveries.filter(status=BroadcastDelivery.Status.PENDING).exists():
+                # Часть доставок не записалась: рассылку продолжит resume_broadcasts
+                print(f"Рассылка #{self.broadcast.pk} не завершена, остались неотправленные сообщения")
+                self._release()
+                return
+            self._release(is_finished=True)
+            self._report_progress(force=True)
+            if self.on_done:
+                self.on_done(self)
+        except Exception as e:
+            print(f"Ошибка рассылки: {str(e)}")
+            try:
+                # Пусть рассылку сразу подхватит resume_broadcasts, не дожидаясь конца аренды
+                self._release()
+            except Exception:
+                pass
+        finally:
+            connection.close()
+            self.finished.set()
+
+    def _delivery_done(self, in_flight, delivery_id, future):
+        in_flight.release()
+        error = future.exception()
+        if error is not None:
+            print(f"Ошибка доставки {delivery_id} рассылки #{self.broadcast.pk}: {str(error)}")
+
+    def _deliver(self, delivery_id, chat_id):
+        # Соединение с БД у каждого потока пула своё и закрывается вместе с потоком
+        error = send_with_retries(self.bot, chat_id, self.broadcast.text, parse_mode='HTML')
+        status = BroadcastDelivery.Status.FAILED if error else BroadcastDelivery.Status.SENT
+        BroadcastDelivery.objects.filter(pk=delivery_id).update(
+            status=status,
+            error=error[:255]
+        )
+        self._count(status)
+
+    def _count(self, status):
+        with self._counter_lock:
+            if status == BroadcastDelivery.Status.SENT:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def _report_progress(self, force=False):
+        if self.broadcast.progress_message_id is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress_at < settings.BROADCAST_PROGRESS_INTERVAL:
+            return
+        self._last_progress_at = now
+        pending = self.total - self.sent - self.failed
+        try:
+            self.bot.edit_message_text(
+                chat_id=self.broadcast.progress_chat_id,
+                message_id=self.broadcast.progress_message_id,
+                text=f"📤 Рассылка{' завершена' if force else ''}: всего {self.total}\n"
+                     f"✅ Доставлено: {self.sent}\n"
+                     f"❌ Не доставлено: {self.failed}\n"
+                     f"⏳ Ожидает: {pending}"
+            )
+        except TelegramError:
+            # Текст не изменился или сообщение удалено - прогресс не критичен
+            pass
+
+
+def create_broadcast(text, recipients, progress_chat_id=None, progress_message_id=None):
+    """Создаёт рассылку, арендованную этим процессом, и журнал доставок для участников из queryset recipients"""
+    with transaction.atomic():
+        broadcast = Broadcast.objects.create(
+            text=text,
+            progress_chat_id=progress_chat_id,
+            progress_message_id=progress_message_id,
+            owner=lease_owner(),
+            lease_expires_at=lease_deadline()
+        )
+        telegram_ids = recipients.values_list('telegram_id', flat=True).order_by().iterator(
+            chunk_size=DELIVERY_CHUNK_SIZE
+        )
+        while True:
+            chunk = list(islice(telegram_ids, DELIVERY_CHUNK_SIZE))
+            if not chunk:
+                break
+            BroadcastDelivery.objects.bulk_create(
+                [BroadcastDelivery(broadcast=broadcast, telegram_id=telegram_id) for telegram_id in chunk],
+                ignore_conflicts=True
+            )
+    return broadcast
+
+
+def start_broadcast(bot, text, recipients, progress_chat_id=None, progress_message_id=None,
+                    on_done=None):
+    """Запускает рассылку text по участникам из queryset recipients"""
+    broadcast = create_broadcast(
+        text,
+        recipients,
+        progress_chat_id=progress_chat_id,
+        progress_message_id=progress_message_id
+    )
+    return BroadcastSender(bot, broadcast, on_done=on_done).start()
+
+
+def resume_broadcasts(bot):
+    """Продолжает рассылки, отправитель которых пропал (аренда истекла)"""
+    stale = Broadcast.objects.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=timezone.now()),
+        is_finished=False
+    )
+    for broadcast in stale:
+        # Рассылку могли забрать другие процессы бота или вебхука
+        if claim_broadcast(broadcast.pk):
+            print(f"Продолжаем рассылку #{broadcast.pk}")
+            BroadcastSender(bot, broadcast).start()
+
+
+def resume_broadcasts_job(context):
+    """Задача JobQueue: подхватывает рассылки упавших процессов"""
+    try:
+        resume_broadcasts(context.bot)
+    except Exception as e:
+        print(f"Не удалось продолжить рассылки: {str(e)}")
+    finally:
+        connection.close()
+
+
+def schedule_broadcast_resume(job_queue):
+    job_queue.run_repeating(
+        resume_broadcasts_job,
+        interval=settings.DELIVERY_LEASE_TIMEOUT,
+        first=0,
+        name='resume_broadcasts'
+    )
@@ -0,0 +1,89 @@
+from queue import Queue
+from threading import Lock, Thread
+
+from django.db import close_old_connections, connection
+from telegram import Update
+from telegram.ext import Dispatcher
+
+
+class ChatOrderedDispatcher(Dispatcher):
+    """Диспетчер, который обрабатывает обновления разных чатов параллельно.
+
+    Каждый чат закреплён за одним потоком-обработчиком (по chat_id),
+    поэтому внутри чата обновления идут строго по очереди и переходы
+    состояний ConversationHandler не перемешиваются.
+    """
+
+    def __init__(self, *args, chat_workers=4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chat_workers = chat_workers
+        self._chat_queues = [Queue() for _ in range(chat_workers)]
+        self._chat_threads = []
+        self._busy_workers = 0
+        self._busy_lock = Lock()
+
+    def start(self, ready=None):
+        self.start_chat_workers()
+        super().start(ready)
+
+    def start_chat_workers(self):
+        """Запускает только потоки-обработчики; обновления передаются через process_update"""
+        if not self._chat_threads:
+            for index, queue in enumerate(self._chat_queues):
+                thread = Thread(
+                    target=self._chat_worker,
+                    args=(queue,),
+                    name=f'chat_worker_{index}',
+                    daemon=True
+                )
+                thread.start()
+                self._chat_threads.append(thread)
+
+    def stop(self):
+        super().stop()
+        for queue in self._chat_queues:
+            queue.put(None)
+        for thread in self._chat_threads:
+            thread.join()
+        self._chat_threads = []
+
+    def process_update(self, update):
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            # Ошибки и обновления без чата обрабатываем сразу
+            super().process_update(update)
+            return
+        self._chat_queues[chat.id % self.chat_workers].put(update)
+
+    def _chat_worker(self, queue):
+        while True:
+            update = queue.get()
+            if update is None:
+                queue.task_done()
+                break
+            with self._busy_lock:
+                self._busy_workers += 1
+            # Как Django на каждый HTTP-запрос: закрываем соединение, которое
+            # устарело (CONN_MAX_AGE) или оборвано базой (CONN_HEALTH_CHECKS)
+            close_old_connections()
+            try:
+                super().process_update(update)
+            except Exception as e:
+                print(f"Ошибка при обработке обновления {update.update_id}: {str(e)}")
+            finally:
+                close_old_connections()
+                with self._busy_lock:
+                    self._busy_workers -= 1
+                queue.task_done()
+        connection.close()
+
+    def get_stats(self):
+        """Глубина очередей и загрузка потоков-обработчиков"""
+        with self._busy_lock:
+            busy = self._busy_workers
+        return {
+            'queue_depth': sum(queue.qsize() for queue in self._chat_queues) + self.update_queue.qsize(),
+            'busy_workers': busy,
+            'workers': self.chat_workers,
+            'saturation': busy / self.chat_workers,
+        }
@@ -0,0 +1,102 @@
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from events_bot.models import Donation
+
+PAYMENT_SUCCEEDED = 'payment.succeeded'
+PAYMENT_CANCELED = 'payment.canceled'
+
+
+class _Notification:
+    __slots__ = ('payment_id', 'event', 'done', 'ok')
+
+    def __init__(self, payment_id, event):
+        self.payment_id = payment_id
+        self.event = event
+        self.done = Event()
+        self.ok = False
+
+
+class DonationConfirmer:
+    """Применяет уведомления ЮKassa к донатам пачками.
+
+    Запросы вебхука складывают уведомления в очередь и ждут, пока фоновый
+    поток запишет их: все накопленные за max_delay секунд уведомления
+    применяются двумя UPDATE в одной транзакции. Повторное уведомление
+    о том же платеже ничего не меняет.
+    """
+
+    def __init__(self, max_batch, max_delay):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = Queue()
+        self._thread = None
+        self._thread_lock = Lock()
+
+    def submit(self, payment_id, event, timeout):
+        """Ставит уведомление в очередь; True, если оно записано в БД за timeout секунд"""
+        self._ensure_thread()
+        notification = _Notification(payment_id, event)
+        self._queue.put(notification)
+        return notification.done.wait(timeout) and notification.ok
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='donation_confirmer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except Empty:
+                    break
+
+            try:
+                apply_notifications(batch)
+                ok = True
+                # Поток живёт всё время процесса: соединение, оборванное базой, заменяем новым
+                connection.close_if_unusable_or_obsolete()
+            except Exception as e:
+                print(f"Не удалось обновить донаты: {str(e)}")
+                ok = False
+                connection.close()
+            for notification in batch:
+                notification.ok = ok
+                notification.done.set()
+
+
+def apply_notifications(notifications):
+    """Подтверждает или отменяет донаты по списку уведомлений"""
+    succeeded = {n.payment_id for n in notifications if n.event == PAYMENT_SUCCEEDED}
+    canceled = {n.payment_id for n in notifications if n.event == PAYMENT_CANCELED} - succeeded
+    with transaction.atomic():
+        if succeeded:
+            Donation.objects.filter(payment_id__in=succeeded, is_confirmed=False).update(
+                is_confirmed=True,
+                is_canceled=False
+            )
+        if canceled:
+            # Подтверждённый платёж отменой не перезаписываем
+            Donation.objects.filter(
+                payment_id__in=canceled,
+                is_confirmed=False,
+                is_canceled=False
+            ).update(is_canceled=True)
+
+
+donation_confirmer = DonationConfirmer(
+    max_batch=settings.YOOKASSA_WEBHOOK_BATCH_SIZE,
+    max_delay=settings.YOOKASSA_WEBHOOK_BATCH_DELAY
+)
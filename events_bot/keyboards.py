@@ -0,0 +1,107 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
+
+from events_bot.models import Event
+from events_bot.snapshots import Snapshot
+
+
+class _SerializedOnce:
+    """Готовые клавиатуры не меняются, поэтому JSON для них строится один раз"""
+    __slots__ = ()
+
+    def to_json(self):
+        if self._json is None:
+            self._json = super().to_json()
+        return self._json
+
+
+class CachedReplyKeyboardMarkup(_SerializedOnce, ReplyKeyboardMarkup):
+    __slots__ = ('_json',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._json = None
+
+
+class CachedInlineKeyboardMarkup(_SerializedOnce, InlineKeyboardMarkup):
+    __slots__ = ('_json',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._json = None
+
+
+@lru_cache(maxsize=None)
+def main_keyboard(is_speaker, is_event_manager):
+    """Кнопки главного меню для сочетания ролей"""
+    keyboard = [
+        ["📅 Мероприятие", "📝 Регистрация"],
+        ["🙋 Пообщаться", "🎁 Поддержать"]
+    ]
+
+    # Добавляем кнопку "Мои вопросы" только для спикеров
+    if is_speaker:
+        keyboard.append(["❓ Мои вопросы"])
+
+    # Добавляем кнопку "Сделать рассылку" только для организаторов и спикеров
+    if is_event_manager:
+        keyboard.append(["📢 Сделать рассылку"])
+
+    return CachedReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=False)
+
+
+@lru_cache(maxsize=None)
+def event_menu_keyboard(is_subscribed):
+    """Подменю 'Мероприятие' с кнопкой подписки или отписки"""
+    keyboard = [
+        ["📜 Программа", "📋 Мои мероприятия"],
+        ["❓ Задать вопрос спикеру"],
+        ["🎤 Кто выступает сейчас?"],
+    ]
+
+    if not is_subscribed:
+        keyboard.append(["🔙 Назад", "✅ Подписаться на рассылку"])
+    else:
+        keyboard.append(["🔙 Назад", "❌ Отписаться от рассылки"])
+
+    return CachedReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+REGISTRATION_KEYBOARD = CachedReplyKeyboardMarkup([
+    ["👤 Зарегистрироваться участником"],
+    ["🎤 Зарегистрироваться спикером"],
+    ["🔙 Назад"]
+], resize_keyboard=True)
+
+DONATE_KEYBOARD = CachedInlineKeyboardMarkup([
+    [InlineKeyboardButton("💵 100 ₽", callback_data='donate_100')],
+    [InlineKeyboardButton("💵 300 ₽", callback_data='donate_300')],
+    [InlineKeyboardButton("💵 500 ₽", callback_data='donate_500')],
+    [InlineKeyboardButton(
+        "✨ Другая сумма", callback_data='donate_custom')],
+])
+
+
+def build_events_keyboard():
+    """Клавиатура с активными и будущими мероприятиями"""
+    events = Event.objects.filter(date__gte=timezone.localdate()).order_by('date')
+    keyboard = [
+        [InlineKeyboardButton(
+            event.get_full_name(),
+            callback_data=f"event_{event.id}"
+        )]
+        for event in events
+    ]
+    keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data='cancel')])
+    return CachedInlineKeyboardMarkup(keyboard)
+
+
+# Перестраивается после изменения мероприятий и по истечении ttl (в т.ч. при смене даты)
+events_keyboard = Snapshot(build_events_keyboard, ttl=settings.SNAPSHOT_TTL)
+
+
+def get_events_keyboard():
+    return events_keyboard.get()
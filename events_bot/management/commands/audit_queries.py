@@ -0,0 +1,200 @@
+import re
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from telegram import Update
+from telegram.ext import Dispatcher
+
+from events_bot.management.commands.replay_updates import run_stub_api
+from events_bot.models import BroadcastDelivery, Donation, Event, Participant, Question, Speaker
+
+PARTICIPANT_SCENARIO = [
+    ('text', '/start'),
+    ('text', '📅 Мероприятие'),
+    ('text', '📜 Программа'),
+    ('text', '🎤 Кто выступает сейчас?'),
+    ('text', '❓ Задать вопрос спикеру'),
+    ('text', '/cancel'),
+    ('text', '📋 Мои мероприятия'),
+    ('text', '/cancel'),
+    ('text', '📝 Регистрация'),
+    ('text', '👤 Зарегистрироваться участником'),
+    ('text', '/cancel'),
+    ('text', '🎁 Поддержать'),
+    ('text', '🙋 Пообщаться'),
+    ('callback', 'view_profiles'),
+    ('callback', 'next_profile'),
+    ('text', '/search доклад'),
+    ('text', '✅ Подписаться на рассылку'),
+    ('callback', 'subscribe_cancel'),
+]
+
+SPEAKER_SCENARIO = [
+    ('text', '/start'),
+    ('text', '❓ Мои вопросы'),
+    ('text', '/search вопрос'),
+]
+
+TABLE_RE = re.compile(r'^SCAN (\w+)')
+SEQ_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+
+def background_queries():
+    """Запросы фоновых задач (рассылки, анонсы, сверка донатов, досылка вопросов)"""
+    return {
+        "Назначенные анонсы": Event.objects.filter(announce_after__lte=timezone.now()).values_list(
+            'pk', 'announce_after'
+        ),
+        "Получатели рассылки": Participant.objects.filter(is_subscribed=True).values_list(
+            'telegram_id', flat=True
+        ).order_by(),
+        "Неотправленные доставки рассылки": BroadcastDelivery.objects.filter(
+            broadcast_id=0,
+            status=BroadcastDelivery.Status.PENDING,
+            id__gt=0
+        ).order_by('id').values_list('id', 'telegram_id')[:500],
+        "Неподтверждённые донаты (сверка)": Donation.objects.filter(
+            is_confirmed=False,
+            is_canceled=False,
+            payment_id__isnull=False,
+            id__gt=0
+        ).only('id', 'payment_id', 'is_confirmed', 'is_canceled').order_by('id')[:100],
+        "Недоставленные вопросы": Question.objects.filter(
+            is_delivered=False,
+            event__is_active=True
+        ).values_list('id', flat=True),
+    }
+
+
+def build_update(kind, payload, user_id, username, update_id):
+    user = {'id': user_id, 'is_bot': False, 'first_name': 'Audit', 'username': username}
+    chat = {'id': user_id, 'type': 'private'}
+    if kind == 'callback':
+        return {
+            'update_id': update_id,
+            'callback_query': {
+                'id': str(update_id),
+                'chat_instance': str(user_id),
+                'data': payload,
+                'from': user,
+                'message': {'message_id': 1, 'date': int(time.time()), 'chat': chat, 'text': '-'},
+            },
+        }
+    message = {'message_id': update_id, 'date': int(time.time()), 'chat': chat, 'from': user, 'text': payload}
+    if payload.startswith('/'):
+        command_length = len(payload.split()[0])
+        message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': command_length}]
+    return {'update_id': update_id, 'message': message}
+
+
+class QueryRecorder:
+    """execute_wrapper: запоминает уникальные запросы и то, что их вызвало"""
+
+    def __init__(self):
+        self.label = ''
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            self.queries.setdefault(sql, (self.label, params))
+        return execute(sql, params, many, context)
+
+
+def explain(sql, params):
+    """План запроса: список строк"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[3] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN {sql}', params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Таблицы, которые план читает целиком, без индекса"""
+    tables = []
+    for line in plan:
+        if connection.vendor == 'sqlite':
+            match = TABLE_RE.match(line.strip())
+            if match and 'USING' not in line and 'VIRTUAL TABLE' not in line:
+                tables.append(match.group(1))
+        else:
+            tables.extend(SEQ_SCAN_RE.findall(line))
+    return tables
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет типичные действия участника и спикера через обработчики бота, "
+        "выполняет EXPLAIN для каждого запроса к базе и отмечает полные просмотры таблиц"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help="Не отмечать полные просмотры таблиц меньше этого размера")
+        parser.add_argument('--port', type=int, default=8766, help="Порт заглушки Bot API")
+
+    def handle(self, *args, **options):
+        participant = Participant.objects.order_by('pk').first()
+        speaker = Speaker.objects.filter(telegram_id__isnull=False).order_by('pk').first()
+        if participant is None:
+            raise CommandError("В базе нет участников - аудировать нечего")
+
+        ready = threading.Event()
+        threading.Thread(
+            target=run_stub_api,
+            args=(options['port'], 0, ready),
+            daemon=True
+        ).start()
+        ready.wait()
+
+        recorder = QueryRecorder()
+        with override_settings(TG_API_URL=f"http://127.0.0.1:{options['port']}/bot"):
+            from events_bot.telegram_bot import create_updater
+            dispatcher = create_updater(schedule_jobs=False).dispatcher
+
+            scenarios = [(participant.telegram_id, participant.telegram_username, PARTICIPANT_SCENARIO)]
+            if speaker is not None:
+                scenarios.append((speaker.telegram_id, speaker.telegram_username, SPEAKER_SCENARIO))
+            update_id = 0
+            with connection.execute_wrapper(recorder):
+                for user_id, username, scenario in scenarios:
+                    for kind, payload in scenario:
+                        update_id += 1
+                        recorder.label = payload
+                        update = Update.de_json(build_update(kind, payload, user_id, username, update_id), dispatcher.bot)
+                        # Синхронно, в этом потоке: иначе запросы не попадут в execute_wrapper
+                        Dispatcher.process_update(dispatcher, update)
+                for label, queryset in background_queries().items():
+                    recorder.label = label
+                    list(queryset)
+
+        table_sizes = {}
+        flagged = 0
+        for sql, (label, params) in recorder.queries.items():
+            plan = explain(sql, params)
+            scans = []
+            for table in full_scans(plan):
+                if table not in table_sizes:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                        table_sizes[table] = cursor.fetchone()[0]
+                if table_sizes[table] >= options['min_rows']:
+                    scans.append(f"{table} ({table_sizes[table]} строк)")
+            if not scans and options['verbosity'] < 2:
+                continue
+
+            flagged += bool(scans)
+            self.stdout.write(f"\n[{label}] {sql[:300]}")
+            for line in plan:
+                self.stdout.write(f"    {line}")
+            if scans:
+                self.stdout.write(self.style.WARNING(f"    Полный просмотр: {', '.join(scans)}"))
+
+        self.stdout.write(
+            f"\nЗапросов: {len(recorder.queries)}, с полным просмотром больших таблиц: {flagged}"
+        )
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from events_bot import broadcast
+from events_bot.management.commands.replay_updates import run_stub_api
+from events_bot.models import Broadcast, BroadcastDelivery
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет скорость рассылки через локальную заглушку Bot API. "
+        "Рассылка с журналом доставок удаляется после замера"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=2000)
+        parser.add_argument('--rate', type=float, default=settings.BROADCAST_RATE,
+                            help="Лимит сообщений в секунду (0 - без лимита)")
+        parser.add_argument('--latency', type=float, default=0.05, help="Задержка ответа заглушки, с")
+        parser.add_argument('--port', type=int, default=8767, help="Порт заглушки Bot API")
+
+    def handle(self, *args, **options):
+        ready = threading.Event()
+        threading.Thread(
+            target=run_stub_api,
+            args=(options['port'], options['latency'], ready),
+            daemon=True
+        ).start()
+        ready.wait()
+
+        broadcast.rate_limiter.interval = 1 / options['rate'] if options['rate'] else 0
+
+        # Журнал доставок пишем сами: участники для замера не нужны
+        mailing = Broadcast.objects.create(text="Замер скорости рассылки")
+        BroadcastDelivery.objects.bulk_create([
+            BroadcastDelivery(broadcast=mailing, telegram_id=index)
+            for index in range(1, options['recipients'] + 1)
+        ], batch_size=broadcast.DELIVERY_CHUNK_SIZE)
+
+        with override_settings(TG_API_URL=f"http://127.0.0.1:{options['port']}/bot"):
+            from events_bot.bot_client import get_bot
+            started = time.perf_counter()
+            broadcast.claim_broadcast(mailing.pk)
+            sender = broadcast.BroadcastSender(get_bot(), mailing).start()
+            sender.finished.wait()
+            elapsed = time.perf_counter() - started
+
+        mailing.delete()
+
+        rate = f"{options['rate']:g} сообщ./с" if options['rate'] else "без лимита"
+        self.stdout.write(
+            f"{options['recipients']} получателей, {rate}, {settings.BROADCAST_WORKERS} потоков, "
+            f"задержка API {options['latency'] * 1000:.0f} мс: {elapsed:.2f} с, "
+            f"{sender.sent / elapsed:.1f} сообщ./с, доставлено {sender.sent}, ошибок {sender.failed}"
+        )
@@ -0,0 +1,90 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from telegram import Update, User
+from telegram.ext import Filters, MessageHandler
+
+from events_bot.routing import MenuRouter
+
+FREE_TEXTS = [
+    'Добрый день!',
+    'Когда начало?',
+    '/start',
+]
+
+
+def find_handler(handlers, update):
+    """Первый обработчик группы, который принял обновление (как в Dispatcher.process_update)"""
+    for handler in handlers:
+        check = handler.check_update(update)
+        if check is not None and check is not False:
+            return handler
+    return None
+
+
+def expand_router(handlers):
+    """Та же группа, но кнопки меню разбираются цепочкой MessageHandler(Filters.regex(...))"""
+    expanded = []
+    for handler in handlers:
+        if isinstance(handler, MenuRouter):
+            expanded.extend(
+                MessageHandler(Filters.regex(f'^{re.escape(text)}$'), callback)
+                for text, callback in handler.routes.items()
+            )
+        else:
+            expanded.append(handler)
+    return expanded
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет стоимость выбора обработчика для одного обновления: "
+        "MenuRouter против цепочки regex-обработчиков для тех же кнопок"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--updates', type=int, default=1000, help="Обновлений в смеси")
+        parser.add_argument('--chats', type=int, default=20)
+        parser.add_argument('--rounds', type=int, default=20)
+
+    def handle(self, *args, **options):
+        from events_bot.telegram_bot import create_updater
+
+        dispatcher = create_updater(schedule_jobs=False).dispatcher
+        # CommandHandler сверяет имя бота; getMe не нужен
+        dispatcher.bot._bot = User(1, 'Meetup', True, username='meetup_bot')
+
+        handlers = dispatcher.handlers[0]
+        router = next(handler for handler in handlers if isinstance(handler, MenuRouter))
+        texts = list(router.routes) + FREE_TEXTS
+        updates = []
+        for update_id in range(options['updates']):
+            text = texts[update_id % len(texts)]
+            chat_id = 100000 + update_id % options['chats']
+            message = {
+                'message_id': update_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Bench'},
+                'text': text,
+            }
+            if text.startswith('/'):
+                message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text)}]
+            updates.append(Update.de_json({'update_id': update_id, 'message': message}, dispatcher.bot))
+
+        for name, chain in (("regex", expand_router(handlers)), ("MenuRouter", handlers)):
+            # Первый проход подгружает состояния диалогов из базы
+            for update in updates:
+                find_handler(chain, update)
+            started = time.perf_counter()
+            for _ in range(options['rounds']):
+                for update in updates:
+                    find_handler(chain, update)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name}: {len(chain)} обработчиков в группе, "
+                f"{elapsed / (options['rounds'] * len(updates)) * 1e6:.1f} мкс на обновление"
+            )
+
+        dispatcher.persistence.flush()
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events_bot.keyboards import (
+    build_events_keyboard,
+    event_menu_keyboard,
+    get_events_keyboard,
+    main_keyboard
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Микробенчмарк клавиатур меню: сборка и сериализация на каждый вызов "
+        "против готовых клавиатур из keyboards.py"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=20000, help="Вызовов на каждый вариант")
+
+    def measure(self, build, calls):
+        started = time.perf_counter()
+        for _ in range(calls):
+            build().to_json()
+        return (time.perf_counter() - started) / calls * 1e6
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        cases = [
+            (
+                "Главное меню спикера",
+                lambda: main_keyboard.__wrapped__(True, False),
+                lambda: main_keyboard(True, False),
+                calls
+            ),
+            (
+                "Меню мероприятия",
+                lambda: event_menu_keyboard.__wrapped__(False),
+                lambda: event_menu_keyboard(False),
+                calls
+            ),
+            # Сборка этой клавиатуры читает мероприятия из базы, поэтому вызовов меньше
+            ("Клавиатура мероприятий", build_events_keyboard, get_events_keyboard, max(1, calls // 100)),
+        ]
+        for name, build, cached, build_calls in cases:
+            self.stdout.write(
+                f"{name}: сборка {self.measure(build, build_calls):.2f} мкс, "
+                f"готовая {self.measure(cached, calls):.2f} мкс на вызов"
+            )
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from events_bot.models import Participant
+from events_bot.telegram_bot import find_next_profile
+
+BENCH_TELEGRAM_ID = 980000000
+
+
+def scan_profiles(participant, user_data):
+    """Прежний просмотр анкет: все анкеты в память и поиск первой непоказанной"""
+    viewed = user_data.setdefault('viewed_profiles', [])
+    other_profiles = Participant.objects.exclude(telegram_id=participant.telegram_id).filter(bio__isnull=False)
+    for profile in list(other_profiles):
+        if profile.telegram_id not in viewed:
+            viewed.append(profile.telegram_id)
+            return profile
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Листание анкет при большом числе участников: прежний перебор всех анкет "
+        "против курсора по id. Участники для замера откатываются после него"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--participants', type=int, default=100000)
+        parser.add_argument('--presses', type=int, default=200, help="Нажатий «Следующая анкета» на вариант")
+        parser.add_argument('--scan-presses', type=int, default=10,
+                            help="Нажатий для прежнего перебора: он на порядки медленнее")
+
+    def measure(self, browse, participant, presses):
+        user_data = {}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(presses):
+                browse(participant, user_data)
+            elapsed = time.perf_counter() - started
+        return elapsed / presses * 1000, len(queries) / presses
+
+    def handle(self, *args, **options):
+        count = options['participants']
+        # Участники создаются и откатываются в одной транзакции: удаление 100 тысяч
+        # строк с сигналами (кэш, поиск, рекомендации) заняло бы минуты
+        with transaction.atomic():
+            Participant.objects.bulk_create([
+                Participant(telegram_id=telegram_id, name=f"Участник {telegram_id}", bio="Анкета для замера")
+                for telegram_id in range(BENCH_TELEGRAM_ID, BENCH_TELEGRAM_ID + count + 1)
+            ], batch_size=5000)
+            viewer = Participant.objects.get(telegram_id=BENCH_TELEGRAM_ID)
+
+            cases = [
+                ("Перебор всех анкет", scan_profiles, options['scan_presses']),
+                ("Курсор по id", find_next_profile, options['presses']),
+            ]
+            for name, browse, presses in cases:
+                per_press, queries = self.measure(browse, viewer, presses)
+                self.stdout.write(
+                    f"{name}, {count} анкет: {per_press:.2f} мс и {queries:.1f} запросов на нажатие"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,94 @@
+import threading
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from events_bot.management.commands.replay_updates import run_stub_api
+from events_bot.models import Event, Participant, Question, Speaker
+from events_bot.views import send_question
+
+BENCH_SPEAKER_ID = 990000000
+BENCH_PARTICIPANT_ID = 990000001
+
+
+class Command(BaseCommand):
+    help = (
+        "Одновременные вопросы спикеру: сохранение и доставка через локальную "
+        "заглушку Bot API. Мероприятие, спикер и участники удаляются после замера"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--askers', type=int, default=50, help="Участников, задающих вопрос одновременно")
+        parser.add_argument('--latency', type=float, default=0.1, help="Задержка ответа заглушки, с")
+        parser.add_argument('--port', type=int, default=8768, help="Порт заглушки Bot API")
+        parser.add_argument('--timeout', type=float, default=60, help="Сколько ждать доставки, с")
+
+    def handle(self, *args, **options):
+        ready = threading.Event()
+        threading.Thread(
+            target=run_stub_api,
+            args=(options['port'], options['latency'], ready),
+            daemon=True
+        ).start()
+        ready.wait()
+
+        askers = options['askers']
+        # bulk_create не вызывает сигналы: бот на той же базе не разошлёт анонс
+        # замерного мероприятия подписчикам
+        event = Event.objects.bulk_create([
+            Event(title="Замер вопросов", description="", date=date.today(), is_active=True)
+        ])[0]
+        participant_ids = range(BENCH_PARTICIPANT_ID, BENCH_PARTICIPANT_ID + askers)
+
+        errors = []
+        barrier = threading.Barrier(askers)
+
+        def ask(telegram_id):
+            barrier.wait()
+            try:
+                send_question('bench_speaker', telegram_id, f"Участник {telegram_id}", "Вопрос для замера")
+            except Exception as e:
+                errors.append(str(e))
+            finally:
+                connection.close()
+
+        try:
+            speaker = Speaker.objects.bulk_create([
+                Speaker(name="Спикер замера", telegram_username='bench_speaker', telegram_id=BENCH_SPEAKER_ID)
+            ])[0]
+            speaker.events.add(event)
+            Participant.objects.bulk_create([
+                Participant(telegram_id=telegram_id, name=f"Участник {telegram_id}")
+                for telegram_id in participant_ids
+            ])
+            with override_settings(TG_API_URL=f"http://127.0.0.1:{options['port']}/bot"):
+                threads = [threading.Thread(target=ask, args=(telegram_id,)) for telegram_id in participant_ids]
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                submitted = time.perf_counter() - started
+
+                questions = Question.objects.filter(event=event)
+                deadline = time.monotonic() + options['timeout']
+                while questions.filter(is_delivered=False).exists() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                delivered_in = time.perf_counter() - started
+                saved = questions.count()
+                delivered = questions.filter(is_delivered=True).count()
+        finally:
+            Participant.objects.filter(telegram_id__in=participant_ids).delete()
+            Speaker.objects.filter(telegram_id=BENCH_SPEAKER_ID).delete()
+            event.delete()
+
+        self.stdout.write(
+            f"{askers} одновременных вопросов, задержка API {options['latency'] * 1000:.0f} мс: "
+            f"сохранены за {submitted:.2f} с ({askers / submitted:.0f} вопр./с), ошибок {len(errors)}; "
+            f"доставлено {delivered} из {saved} за {delivered_in:.2f} с"
+        )
+        for error in errors[:3]:
+            self.stdout.write(f"  {error}")
@@ -0,0 +1,74 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from events_bot.models import Donation, Event, Participant, Question, Speaker
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет скорость записи вопросов и донатов из нескольких потоков "
+        "в базу текущего профиля (DB_ENGINE, SQLITE_*). Созданные записи удаляются"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help="Сколько записей создать")
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        # bulk_create не вызывает сигналы: анонс мероприятия подписчикам не уйдёт
+        tag = uuid.uuid4().hex[:8]
+        event = Event.objects.bulk_create([
+            Event(title=f"bench {tag}", date=timezone.now().date(), is_active=False)
+        ])[0]
+        speaker = Speaker.objects.bulk_create([Speaker(name=f"bench {tag}")])[0]
+        participant = Participant.objects.bulk_create([
+            Participant(telegram_id=-int(tag, 16), name=f"bench {tag}")
+        ])[0]
+
+        def write(index):
+            try:
+                if index % 2:
+                    Donation.objects.create(
+                        event=event,
+                        participant=participant,
+                        amount=100,
+                        payment_id=f"bench-{tag}-{index}"
+                    )
+                else:
+                    Question.objects.create(
+                        event=event,
+                        speaker=speaker,
+                        participant=participant,
+                        text=f"Вопрос {index} о производительности базы"
+                    )
+                return None
+            except DatabaseError as e:
+                return str(e)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            errors = [error for error in pool.map(write, range(options['rows'])) if error]
+        elapsed = time.perf_counter() - started
+
+        event.delete()
+        speaker.delete()
+        participant.delete()
+
+        database = settings.DATABASES['default']
+        profile = database['ENGINE'].rsplit('.', 1)[-1]
+        if connection.vendor == 'sqlite':
+            profile += f" (journal_mode={settings.SQLITE_JOURNAL_MODE}, synchronous={settings.SQLITE_SYNCHRONOUS})"
+        self.stdout.write(
+            f"{profile}: {options['rows']} записей в {options['threads']} потоков за {elapsed:.2f} с, "
+            f"{(options['rows'] - len(errors)) / elapsed:.0f} записей/с, ошибок: {len(errors)}"
+        )
+        if errors:
+            self.stdout.write(f"Первая ошибка: {errors[0]}")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events_bot.reconciliation import donation_reconciler
+
+
+class Command(BaseCommand):
+    help = "Сверяет неподтверждённые донаты со статусами платежей в ЮKassa"
+
+    def handle(self, *args, **options):
+        confirmed, canceled, errors = donation_reconciler.run()
+        self.stdout.write(f"Подтверждено: {confirmed}, отменено: {canceled}")
+        if errors:
+            raise CommandError(f"ЮKassa недоступна ({errors} ошибок), сверка прервана")
@@ -0,0 +1,150 @@
+import json
+import multiprocessing
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandError
+from telegram import Update
+
+from events_bot.bot_client import get_bot
+from events_bot.workers import WorkerPool
+
+MENU_TEXTS = [
+    '/start',
+    '📅 Мероприятие',
+    '📜 Программа',
+    '🎤 Кто выступает сейчас?',
+    '🔙 Назад',
+    '📝 Регистрация',
+    '🔙 Назад',
+    '🙋 Пообщаться',
+]
+
+
+class StubBotAPIHandler(BaseHTTPRequestHandler):
+    """Отвечает на запросы Bot API как Telegram, ничего не отправляя"""
+
+    latency = 0
+
+    def do_POST(self):
+        method = self.path.rsplit('/', 1)[-1]
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            data = {}
+        if self.latency:
+            time.sleep(self.latency)
+
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'Meetup', 'username': 'meetup_bot'}
+        elif method.startswith(('send', 'edit')):
+            result = {
+                'message_id': 1,
+                'date': int(time.time()),
+                'chat': {'id': data.get('chat_id', 1), 'type': 'private'},
+                'text': data.get('text', ''),
+            }
+        else:
+            result = True
+
+        body = json.dumps({'ok': True, 'result': result}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_stub_api(port, latency, ready):
+    StubBotAPIHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubBotAPIHandler)
+    server.daemon_threads = True
+    ready.set()
+    server.serve_forever()
+
+
+def generate_updates(chats, per_chat):
+    """Синтетический поток: участники листают главное меню вперемешку"""
+    updates = []
+    for step in range(per_chat):
+        text = MENU_TEXTS[step % len(MENU_TEXTS)]
+        for chat_id in range(1, chats + 1):
+            update_id = len(updates) + 1
+            message = {
+                'message_id': update_id,
+                'date': int(time.time()),
+                'chat': {'id': 100000 + chat_id, 'type': 'private'},
+                'from': {'id': 100000 + chat_id, 'is_bot': False, 'first_name': f'User {chat_id}'},
+                'text': text,
+            }
+            if text.startswith('/'):
+                message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text)}]
+            updates.append({'update_id': update_id, 'message': message})
+    return updates
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет записанный поток обновлений (JSON lines) через процессы-обработчики "
+        "и выводит число обновлений в секунду для разного числа процессов. "
+        "Обработчики работают с настоящей базой данных"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help="Файл с обновлениями, по одному JSON в строке")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+        parser.add_argument('--chats', type=int, default=200, help="Чатов в синтетическом потоке")
+        parser.add_argument('--per-chat', type=int, default=16, help="Обновлений на чат в синтетическом потоке")
+        parser.add_argument('--api-url', help="Bot API, на который уходят ответы (по умолчанию локальная заглушка)")
+        parser.add_argument('--latency', type=float, default=0, help="Задержка ответа заглушки, с")
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        if options['path']:
+            try:
+                with open(options['path'], encoding='utf-8') as file:
+                    records = [json.loads(line) for line in file if line.strip()]
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Не удалось прочитать поток обновлений: {str(e)}")
+        else:
+            records = generate_updates(options['chats'], options['per_chat'])
+
+        stub = None
+        if options['api_url']:
+            os.environ['TG_API_URL'] = options['api_url']
+        else:
+            context = multiprocessing.get_context('spawn')
+            ready = context.Event()
+            stub = context.Process(
+                target=run_stub_api,
+                args=(options['port'], options['latency'], ready),
+                daemon=True
+            )
+            stub.start()
+            ready.wait()
+            # Процессы-обработчики читают настройки заново и возьмут этот адрес
+            os.environ['TG_API_URL'] = f"http://127.0.0.1:{options['port']}/bot"
+
+        bot = get_bot()
+        updates = [Update.de_json(record, bot) for record in records]
+        self.stdout.write(f"Обновлений в потоке: {len(updates)}")
+        try:
+            for processes in options['workers']:
+                pool = WorkerPool(processes)
+                pool.start()
+                started = time.perf_counter()
+                for update in updates:
+                    pool.put(update)
+                pool.stop()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"Процессов: {processes}: {elapsed:.2f} с, {len(updates) / elapsed:.0f} обновлений/с"
+                )
+        finally:
+            if stub is not None:
+                stub.terminate()
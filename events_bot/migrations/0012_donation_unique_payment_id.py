@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+def clear_empty_payment_ids(apps, schema_editor):
+    """Пустые ID платежей мешают уникальному индексу - заменяем их на NULL"""
+    Donation = apps.get_model('events_bot', 'Donation')
+    Donation.objects.filter(payment_id='').update(payment_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0011_broadcast_broadcastdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='is_canceled',
+            field=models.BooleanField(default=False, verbose_name='Отменён'),
+        ),
+        migrations.RunPython(clear_empty_payment_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='donation',
+            name='payment_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True, verbose_name='ID платежа'),
+        ),
+    ]
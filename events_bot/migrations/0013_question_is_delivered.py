@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+def mark_existing_delivered(apps, schema_editor):
+    """Старые вопросы отправлялись сразу при сохранении"""
+    Question = apps.get_model('events_bot', 'Question')
+    Question.objects.update(is_delivered=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0012_donation_unique_payment_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='is_delivered',
+            field=models.BooleanField(default=False, verbose_name='Доставлен спикеру'),
+        ),
+        migrations.RunPython(mark_existing_delivered, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0013_question_is_delivered'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Сходство')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events_bot.participant', verbose_name='Рекомендуемый участник')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='events_bot.participant', verbose_name='Участник')),
+            ],
+            options={
+                'verbose_name': 'Рекомендация анкеты',
+                'verbose_name_plural': 'Рекомендации анкет',
+                'ordering': ['participant', 'rank'],
+                'indexes': [models.Index(fields=['participant', 'rank'], name='events_bot__partici_5368b3_idx')],
+                'unique_together': {('participant', 'candidate')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:40
+
+from django.db import migrations
+
+SEARCH_TABLES = {
+    'events_bot_question': ['text'],
+    'events_bot_participant': ['name', 'bio'],
+}
+
+
+def create_search_tables(apps, schema_editor):
+    """Полнотекстовые индексы FTS5 (только для SQLite) с уже существующими записями"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, fields in SEARCH_TABLES.items():
+        columns = ', '.join(fields)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table}_fts USING fts5("
+            f"{columns}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {table}_fts (rowid, {columns}) SELECT id, {columns} FROM {table}"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in SEARCH_TABLES:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0014_profilerecommendation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0016_botuserdata_botconversation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(condition=models.Q(('is_canceled', False), ('is_confirmed', False)), fields=['id'], name='donation_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date', 'id'], name='event_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(condition=models.Q(('is_subscribed', True)), fields=['telegram_id'], name='participant_subscribed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_answered', False)), fields=['speaker', '-timestamp'], name='question_unanswered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_delivered', False)), fields=['event'], name='question_undelivered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['event', 'start_time'], name='timeslot_event_start_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0017_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcast',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Пока срок не истёк, рассылку отправляет только процесс-отправитель', null=True, verbose_name='Аренда до'),
+        ),
+        migrations.AddField(
+            model_name='broadcast',
+            name='owner',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Процесс-отправитель'),
+        ),
+    ]
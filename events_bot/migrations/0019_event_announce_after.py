@@ -0,0 +1,22 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0018_broadcast_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='announce_after',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Когда разослать анонс подписчикам (пусто - анонс уже отправлен или не нужен)', null=True, verbose_name='Анонс после'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('announce_after__isnull', False)), fields=['announce_after'], name='event_announce_idx'),
+        ),
+    ]
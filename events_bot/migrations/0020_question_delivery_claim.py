@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0019_event_announce_after'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='delivery_claimed_until',
+            field=models.DateTimeField(blank=True, editable=False, help_text='До этого времени вопрос отправляет один процесс бота', null=True, verbose_name='Отправка занята до'),
+        ),
+    ]
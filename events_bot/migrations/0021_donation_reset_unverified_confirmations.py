@@ -0,0 +1,24 @@
+# Generated by Django 4.2.20 on 2026-10-18 21:05
+
+from django.db import migrations
+
+
+def reset_unverified_confirmations(apps, schema_editor):
+    """Донаты до вебхука ЮKassa отмечались подтверждёнными сразу при создании платежа.
+
+    Снимаем отметку со всех донатов с ID платежа: сверка с ЮKassa подтвердит
+    оплаченные (в том числе уже подтверждённые вебхуком) и отменит остальные.
+    """
+    Donation = apps.get_model('events_bot', 'Donation')
+    Donation.objects.filter(is_confirmed=True, payment_id__isnull=False).update(is_confirmed=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_bot', '0020_question_delivery_claim'),
+    ]
+
+    operations = [
+        migrations.RunPython(reset_unverified_confirmations, migrations.RunPython.noop),
+    ]
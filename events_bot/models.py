@@ -1,19 +1,34 @@
 from django.db import models
 from django.utils import timezone
 
+from events_bot.timeline import Timeline
+
 
 class Event(models.Model):
     title = models.CharField(max_length=255, verbose_name="Название мероприятия")
     description = models.TextField(verbose_name="Описание")
     date = models.DateField(auto_now_add=False, verbose_name="Дата проведения")
     is_active = models.BooleanField(default=True, verbose_name="Активно")
+    announce_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Когда разослать анонс подписчикам (пусто - анонс уже отправлен или не нужен)",
+        verbose_name="Анонс после"
+    )
+
+    _timeline = None
+    _program_lines = None
 
     def __str__(self):
         return self.title
 
-    def get_program(self):
-        """Формирует программу мероприятия из слотов времени."""
-        time_slots = self.time_slots.select_related('speaker').all()
+    def _render_program_lines(self):
+        if 'time_slots' in getattr(self, '_prefetched_objects_cache', {}):
+            # Слоты со спикерами уже загружены снимком (см. snapshots.py)
+            time_slots = self.time_slots.all()
+        else:
+            time_slots = self.time_slots.select_related('speaker')
         program = []
         for slot in time_slots:
             start_local = timezone.localtime(slot.start_time)
@@ -22,33 +37,51 @@ class Event(models.Model):
                 f"{start_local.strftime('%H:%M')} - {end_local.strftime('%H:%M')}: "
                 f"{slot.title} ({slot.speaker.name})"
             )
-        return "\n".join(program) if program else "Программа пока не доступна."
+        return program
 
-    def get_current_speaker(self):
-        if not self.is_active:
-            return None
+    def get_program_lines(self):
+        """Строки программы мероприятия; собираются один раз на экземпляр.
 
-        now = timezone.now()
+        Экземпляры из снимка активных мероприятий живут не дольше SNAPSHOT_TTL,
+        поэтому изменения из админки (в другом процессе) видны не позже, чем через него.
+        """
+        if self._program_lines is None:
+            self._program_lines = self._render_program_lines()
+        return self._program_lines
 
-        # Сначала проверяем слоты с продленным выступлением
-        extended_slot = self.time_slots.filter(
-            is_extended=True
-        ).select_related('speaker').first()
+    def get_program(self):
+        """Формирует программу мероприятия из слотов времени."""
+        program = self.get_program_lines()
+        return "\n".join(program) if program else "Программа пока не доступна."
 
-        if extended_slot:
-            return extended_slot
+    def get_timeline(self):
+        """Расписание для поиска по времени; строится один раз на экземпляр.
 
-        # Если нет продленных выступлений, работаем по расписанию
-        return self.time_slots.filter(
-            start_time__lte=now,
-            end_time__gte=now
-        ).select_related('speaker').first()
+        Слоты берутся из prefetch_related, если он был сделан (см. snapshots.py).
+        """
+        if self._timeline is None:
+            self._timeline = Timeline(self.time_slots.all())
+        return self._timeline
+
+    def get_current_speaker(self):
+        if not self.is_active:
+            return None
+        return self.get_timeline().current(timezone.now())
 
     def get_full_name(self):
         return f"{self.title} ({self.date.strftime('%d.%m.%Y')})"
 
     class Meta:
         ordering = ['date']
+        indexes = [
+            # Клавиатура мероприятий: ближайшие по дате
+            models.Index(fields=['date'], name='event_date_idx'),
+            # Снимок активных мероприятий
+            models.Index(fields=['date', 'id'], condition=models.Q(is_active=True), name='event_active_date_idx'),
+            # Анонсы, которые ждут отправки
+            models.Index(fields=['announce_after'], condition=models.Q(announce_after__isnull=False),
+                         name='event_announce_idx'),
+        ]
         verbose_name = "Мероприятие"
         verbose_name_plural = "Мероприятия"
 
@@ -116,6 +149,8 @@ class TimeSlot(models.Model):
         ordering = ['start_time']
         indexes = [
             models.Index(fields=['start_time', 'end_time']),
+            # Программа мероприятия: слоты по порядку без сортировки
+            models.Index(fields=['event', 'start_time'], name='timeslot_event_start_idx'),
         ]
         verbose_name = "Временной слот"
         verbose_name_plural = "Временные слоты"
@@ -159,10 +194,43 @@ class Participant(models.Model):
         return f"{self.name} (@{self.telegram_username})"
 
     class Meta:
+        indexes = [
+            # Получатели рассылок
+            models.Index(fields=['telegram_id'], condition=models.Q(is_subscribed=True),
+                         name='participant_subscribed_idx'),
+        ]
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
 
 
+class ProfileRecommendation(models.Model):
+    """Похожие анкеты для участника, заранее посчитанные по тексту «О себе»"""
+    participant = models.ForeignKey(
+        Participant,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name="Участник"
+    )
+    candidate = models.ForeignKey(
+        Participant,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Рекомендуемый участник"
+    )
+    rank = models.PositiveIntegerField(verbose_name="Место")
+    score = models.FloatField(verbose_name="Сходство")
+
+    class Meta:
+        ordering = ['participant', 'rank']
+        unique_together = ('participant', 'candidate')
+        indexes = [models.Index(fields=['participant', 'rank'])]
+        verbose_name = "Рекомендация анкеты"
+        verbose_name_plural = "Рекомендации анкет"
+
+    def __str__(self):
+        return f"{self.participant.name} → {self.candidate.name} ({self.rank})"
+
+
 class Question(models.Model):
     event = models.ForeignKey(
         Event,
@@ -185,9 +253,25 @@ class Question(models.Model):
     text = models.TextField(verbose_name="Текст вопроса")
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Время создания")
     is_answered = models.BooleanField(default=False, verbose_name="Ответ получен")
+    is_delivered = models.BooleanField(default=False, verbose_name="Доставлен спикеру")
+    delivery_claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="До этого времени вопрос отправляет один процесс бота",
+        verbose_name="Отправка занята до"
+    )
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # «Мои вопросы» спикера
+            models.Index(fields=['speaker', '-timestamp'], condition=models.Q(is_answered=False),
+                         name='question_unanswered_idx'),
+            # Досылка вопросов после перезапуска
+            models.Index(fields=['event'], condition=models.Q(is_delivered=False),
+                         name='question_undelivered_idx'),
+        ]
         verbose_name = "Вопрос"
         verbose_name_plural = "Вопросы"
 
@@ -196,7 +280,7 @@ class Question(models.Model):
 
     def mark_answered(self):
         self.is_answered = True
-        self.save()
+        self.save(update_fields=['is_answered'])
 
 
 class Donation(models.Model):
@@ -222,17 +306,24 @@ class Donation(models.Model):
         max_length=100,
         blank=True,
         null=True,
+        unique=True,
         verbose_name="ID платежа"
     )
     is_confirmed = models.BooleanField(default=False, verbose_name="Подтверждён")
+    is_canceled = models.BooleanField(default=False, verbose_name="Отменён")
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Сверка неподтверждённых донатов
+            models.Index(fields=['id'], condition=models.Q(is_confirmed=False, is_canceled=False),
+                         name='donation_pending_idx'),
+        ]
         verbose_name = "Донат"
         verbose_name_plural = "Донаты"
 
     def __str__(self):
-        status = "✅" if self.is_confirmed else "⏳"
+        status = "✅" if self.is_confirmed else "❌" if self.is_canceled else "⏳"
         return f"{status} Донат {self.amount}₽ от {self.participant.name}"
 
 
@@ -260,3 +351,105 @@ class ConnectionRequest(models.Model):
 
     def __str__(self):
         return f"Запрос на знакомство от {self.participant.name} к {self.target_participant.name}"
+
+
+class Broadcast(models.Model):
+    text = models.TextField(verbose_name="Текст рассылки")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Время создания")
+    progress_chat_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Чат для отчёта о прогрессе"
+    )
+    progress_message_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Сообщение с прогрессом"
+    )
+    is_finished = models.BooleanField(default=False, verbose_name="Завершена")
+    owner = models.CharField(max_length=100, blank=True, verbose_name="Процесс-отправитель")
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Пока срок не истёк, рассылку отправляет только процесс-отправитель",
+        verbose_name="Аренда до"
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Рассылка"
+        verbose_name_plural = "Рассылки"
+
+    def __str__(self):
+        return f"Рассылка от {self.created_at.strftime('%d.%m.%Y %H:%M')}"
+
+    def get_status_counts(self):
+        """Количество доставок по статусам"""
+        counts = dict.fromkeys(BroadcastDelivery.Status.values, 0)
+        counts.update(
+            self.deliveries.values_list('status').annotate(count=models.Count('id')).order_by()
+        )
+        return counts
+
+
+class BroadcastDelivery(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', "Ожидает отправки"
+        SENT = 'sent', "Доставлено"
+        FAILED = 'failed', "Не доставлено"
+
+    broadcast = models.ForeignKey(
+        Broadcast,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name="Рассылка"
+    )
+    telegram_id = models.BigIntegerField(verbose_name="Telegram ID получателя")
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Статус"
+    )
+    error = models.CharField(max_length=255, blank=True, verbose_name="Ошибка")
+
+    class Meta:
+        unique_together = [['broadcast', 'telegram_id']]
+        indexes = [
+            models.Index(fields=['broadcast', 'status']),
+        ]
+        verbose_name = "Доставка рассылки"
+        verbose_name_plural = "Доставки рассылки"
+
+    def __str__(self):
+        return f"{self.telegram_id}: {self.get_status_display()}"
+
+
+class BotUserData(models.Model):
+    """context.user_data пользователя бота (только простые значения и id)"""
+    telegram_id = models.BigIntegerField(unique=True, verbose_name="Telegram ID")
+    data = models.JSONField(default=dict, verbose_name="Данные")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
+
+    class Meta:
+        verbose_name = "Данные пользователя бота"
+        verbose_name_plural = "Данные пользователей бота"
+
+    def __str__(self):
+        return str(self.telegram_id)
+
+
+class BotConversation(models.Model):
+    """Текущее состояние ConversationHandler для чата"""
+    name = models.CharField(max_length=50, verbose_name="Диалог")
+    key = models.CharField(max_length=100, verbose_name="Ключ")
+    state = models.JSONField(verbose_name="Состояние")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
+
+    class Meta:
+        unique_together = [['name', 'key']]
+        verbose_name = "Состояние диалога"
+        verbose_name_plural = "Состояния диалогов"
+
+    def __str__(self):
+        return f"{self.name} {self.key}: {self.state}"
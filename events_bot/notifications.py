@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from events_bot.broadcast import BroadcastSender, create_broadcast
+from events_bot.models import Event, Participant
+
+
+def schedule_announcement(event_id):
+    """Назначает анонс нового мероприятия через NEW_EVENT_NOTIFY_DELAY секунд"""
+    Event.objects.filter(pk=event_id).update(
+        announce_after=timezone.now() + timedelta(seconds=settings.NEW_EVENT_NOTIFY_DELAY)
+    )
+
+
+def postpone_announcement(event_id):
+    """Переносит анонс, только если он ещё не отправлен.
+
+    Серия сохранений (мероприятие, затем его слоты) даёт один анонс со всей программой.
+    """
+    Event.objects.filter(pk=event_id, announce_after__isnull=False).update(
+        announce_after=timezone.now() + timedelta(seconds=settings.NEW_EVENT_NOTIFY_DELAY)
+    )
+
+
+def send_new_event_notification(bot, event):
+    """Отправление подписчикам уведомлений о новых событиях.
+
+    Рассылка идёт в фоне и начинается после фиксации транзакции;
+    возвращает созданную Broadcast или None.
+    """
+
+    subscribed_participants = Participant.objects.filter(is_subscribed=True)
+
+    if not subscribed_participants.exists():
+        print("No subscribed participants to notify about new event.")
+        return None
+
+    try:
+        notification_text = (
+            f"🎉 <b>Новое мероприятие анонсировано!</b>\n\n"
+            f"📅 <b>{event.title}</b>\n"
+            f"🕒 Дата: {event.date.strftime('%d.%m.%Y')}\n"
+            f"📜 Программа:\n{event.get_program()}\n\n"
+            f"<i>Зарегистрируйтесь или задайте вопросы спикерам через бота!</i>"
+        )
+    except Exception as e:
+        print(f"Error generating notification text: {str(e)}")
+        return None
+
+    broadcast = create_broadcast(notification_text, subscribed_participants)
+    transaction.on_commit(lambda: BroadcastSender(bot, broadcast).start())
+    return broadcast
+
+
+def announce_event(bot, event_id, announce_after):
+    """Рассылает анонс, если его не забрал другой процесс"""
+    with transaction.atomic():
+        # Время анонса сбрасывается в одной транзакции с созданием рассылки:
+        # после сбоя останется либо назначенный анонс, либо рассылка
+        claimed = Event.objects.filter(pk=event_id, announce_after=announce_after).update(announce_after=None)
+        if claimed:
+            send_new_event_notification(bot, Event.objects.get(pk=event_id))
+
+
+def announce_events_job(context):
+    """Задача JobQueue: анонсы мероприятий, время которых подошло"""
+    try:
+        due = Event.objects.filter(announce_after__lte=timezone.now()).values_list('pk', 'announce_after')
+        for event_id, announce_after in due:
+            announce_event(context.bot, event_id, announce_after)
+    except Exception as e:
+        print(f"Не удалось выслать уведомление: {str(e)}")
+    finally:
+        connection.close()
+
+
+def schedule_event_announcements(job_queue):
+    job_queue.run_repeating(
+        announce_events_job,
+        interval=settings.NEW_EVENT_NOTIFY_DELAY,
+        first=0,
+        name='announce_events'
+    )
@@ -0,0 +1,110 @@
+import copy
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from telegram.ext import CallbackContext
+
+from events_bot.models import Participant
+
+_MISSING = object()
+
+
+class ParticipantCache:
+    """Кэш участников по telegram_id с ограниченным размером и временем жизни"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, telegram_id):
+        with self._lock:
+            item = self._items.get(telegram_id)
+            if item is None:
+                return _MISSING
+            expires_at, participant = item
+            if expires_at < time.monotonic():
+                del self._items[telegram_id]
+                return _MISSING
+            self._items.move_to_end(telegram_id)
+        # Отдаём копию, чтобы обработчики не меняли общий экземпляр
+        return copy.copy(participant)
+
+    def set(self, telegram_id, participant):
+        with self._lock:
+            self._items[telegram_id] = (time.monotonic() + self.ttl, participant)
+            self._items.move_to_end(telegram_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, telegram_id):
+        with self._lock:
+            self._items.pop(telegram_id, None)
+
+    def invalidate_many(self, telegram_ids):
+        with self._lock:
+            for telegram_id in telegram_ids:
+                self._items.pop(telegram_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+participant_cache = ParticipantCache(
+    maxsize=settings.PARTICIPANT_CACHE_SIZE,
+    ttl=settings.PARTICIPANT_CACHE_TTL
+)
+
+
+def get_participant(telegram_id):
+    """Участник по telegram_id или None (с кэшированием)"""
+    participant = participant_cache.get(telegram_id)
+    if participant is _MISSING:
+        participant = Participant.objects.filter(telegram_id=telegram_id).first()
+        participant_cache.set(telegram_id, participant)
+    return participant
+
+
+def get_or_create_participant(user):
+    """Участник для пользователя Telegram; создаётся, если его ещё нет"""
+    participant = get_participant(user.id)
+    if participant is None:
+        participant, _ = Participant.objects.get_or_create(
+            telegram_id=user.id,
+            defaults={
+                'telegram_username': user.username,
+                'name': user.first_name or 'Аноним'
+            }
+        )
+    return participant
+
+
+class BotContext(CallbackContext):
+    """Контекст обработчика, в котором участник ищется один раз на обновление"""
+
+    _effective_user = None
+    _participant = None
+
+    @classmethod
+    def from_update(cls, update, dispatcher):
+        self = super().from_update(update, dispatcher)
+        self._effective_user = getattr(update, 'effective_user', None)
+        return self
+
+    def get_participant(self):
+        """Участник, отправивший обновление. Как и ORM, бросает Participant.DoesNotExist"""
+        if self._participant is None and self._effective_user is not None:
+            self._participant = get_participant(self._effective_user.id)
+        if self._participant is None:
+            raise Participant.DoesNotExist
+        return self._participant
+
+    def get_or_create_participant(self):
+        """Участник, отправивший обновление; создаётся при первом обращении"""
+        if self._participant is None:
+            self._participant = get_or_create_participant(self._effective_user)
+        return self._participant
@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from yookassa.domain.response import PaymentResponse
+
+
+class PaymentError(Exception):
+    """Запрос к ЮKassa не выполнен"""
+
+
+class PaymentGatewayError(PaymentError):
+    """ЮKassa не ответила вовремя или вернула ошибку сервера"""
+
+
+class PaymentUnavailable(PaymentGatewayError):
+    """ЮKassa сейчас недоступна или перегружена - запрос даже не отправлялся"""
+
+
+class CircuitBreaker:
+    """Перестаёт обращаться к сервису после серии сбоев.
+
+    После threshold ошибок подряд запросы сразу отклоняются на cooldown секунд,
+    затем пропускается один пробный запрос: если он успешен, всё работает как раньше.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+class YooKassaClient:
+    """Создание платежей в ЮKassa без блокировки обработчиков бота.
+
+    Запросы выполняет небольшой пул потоков через одну requests.Session
+    (соединения переиспользуются), у каждого запроса есть таймаут.
+    Очередь ограничена: при её переполнении или открытом предохранителе
+    платёж сразу отклоняется с PaymentUnavailable.
+    """
+
+    def __init__(self, api_url, shop_id, secret_key, workers, timeout, breaker):
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.breaker = breaker
+        self.session = requests.Session()
+        self.session.auth = (shop_id, secret_key)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yookassa')
+        self._slots = BoundedSemaphore(workers * 4)
+
+    def _request(self, method, path, **kwargs):
+        """Запрос к API с таймаутом и предохранителем; возвращает JSON ответа"""
+        if not self.breaker.allow():
+            raise PaymentUnavailable("Платёжный сервис временно недоступен")
+        try:
+            response = self.session.request(method, f'{self.api_url}{path}', timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            raise PaymentGatewayError(f"Платёжный сервис не ответил: {e.__class__.__name__}")
+
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure()
+            raise PaymentGatewayError(f"Платёжный сервис вернул ошибку {response.status_code}")
+        # Ошибка в самом запросе - сервис при этом исправен
+        self.breaker.record_success()
+        if response.status_code != 200:
+            raise PaymentError(response.json().get('description', f"Ошибка {response.status_code}"))
+        return response.json()
+
+    def create_payment(self, params, idempotence_key):
+        """Создаёт платёж синхронно; возвращает PaymentResponse"""
+        return PaymentResponse(self._request(
+            'POST',
+            '/payments',
+            json=params,
+            headers={'Idempotence-Key': idempotence_key}
+        ))
+
+    def get_payment(self, payment_id):
+        """Текущее состояние платежа; возвращает PaymentResponse"""
+        return PaymentResponse(self._request('GET', f'/payments/{payment_id}'))
+
+    def submit_payment(self, params, idempotence_key):
+        """Создаёт платёж в пуле; возвращает Future с PaymentResponse"""
+        if not self._slots.acquire(blocking=False):
+            raise PaymentUnavailable("Слишком много платежей одновременно, попробуйте позже")
+        try:
+            future = self._executor.submit(self.create_payment, params, idempotence_key)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+yookassa_client = YooKassaClient(
+    api_url=settings.YOOKASSA_API_URL,
+    shop_id=settings.YOOKASSA_SHOP_ID,
+    secret_key=settings.YOOKASSA_SECRET_KEY,
+    workers=settings.YOOKASSA_WORKERS,
+    timeout=(settings.YOOKASSA_CONNECT_TIMEOUT, settings.YOOKASSA_READ_TIMEOUT),
+    breaker=CircuitBreaker(settings.YOOKASSA_BREAKER_THRESHOLD, settings.YOOKASSA_BREAKER_COOLDOWN)
+)
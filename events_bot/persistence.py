@@ -0,0 +1,199 @@
+import json
+import time
+from collections import defaultdict
+from threading import Lock, Thread
+
+from django.db import connection, transaction
+from telegram.ext import BasePersistence
+
+from events_bot.models import BotConversation, BotUserData
+
+
+class LazyUserData(defaultdict):
+    """user_data, которые подгружаются из базы при первом обращении к пользователю"""
+
+    def __init__(self, loader):
+        super().__init__(dict)
+        self._loader = loader
+
+    def __missing__(self, user_id):
+        data = self._loader(user_id)
+        self[user_id] = data
+        return data
+
+
+class LazyConversations(dict):
+    """Состояния одного ConversationHandler, которые подгружаются по ключу чата"""
+
+    def __init__(self, loader):
+        super().__init__()
+        self._loader = loader
+        self._loaded = set()
+
+    def _load(self, key):
+        if key in self._loaded:
+            return
+        self._loaded.add(key)
+        state = self._loader(key)
+        if state is not None:
+            super().__setitem__(key, state)
+
+    def get(self, key, default=None):
+        self._load(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self._load(key)
+        return super().__contains__(key)
+
+    def __missing__(self, key):
+        self._load(key)
+        if super().__contains__(key):
+            return super().__getitem__(key)
+        raise KeyError(key)
+
+
+def _conversation_key(key):
+    return json.dumps(list(key))
+
+
+def _snapshot(data):
+    return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+
+class DjangoPersistence(BasePersistence):
+    """Хранит состояния диалогов и user_data в моделях BotConversation и BotUserData.
+
+    Данные пользователя и состояние диалога читаются из базы при первом
+    обращении к чату. Изменения копятся в памяти и раз в flush_interval
+    секунд записываются в базу пачкой; неизменившиеся user_data не пишутся.
+    Сохраняются только значения, которые можно записать в JSON, поэтому
+    в user_data кладутся id, а не объекты моделей.
+    """
+
+    def __init__(self, flush_interval):
+        super().__init__(store_user_data=True, store_chat_data=False, store_bot_data=False)
+        self.flush_interval = flush_interval
+        self._user_data = None
+        self._conversations = {}
+        # Последнее сохранённое (или поставленное в очередь) состояние user_data
+        self._saved_user_data = {}
+        self._dirty_user_data = {}
+        self._dirty_conversations = {}
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._flush_thread = Thread(target=self._flush_loop, name='persistence_flush', daemon=True)
+        self._flush_thread.start()
+
+    # Объекты Bot в данных не хранятся, поэтому глубокое копирование
+    # при каждом чтении и записи не нужно
+    def insert_bot(self, obj):
+        return obj
+
+    @classmethod
+    def replace_bot(cls, obj):
+        return obj
+
+    def _load_user_data(self, user_id):
+        data = BotUserData.objects.filter(telegram_id=user_id).values_list('data', flat=True).first() or {}
+        with self._lock:
+            self._saved_user_data.setdefault(user_id, _snapshot(data))
+        return data
+
+    def get_user_data(self):
+        if self._user_data is None:
+            self._user_data = LazyUserData(self._load_user_data)
+        return self._user_data
+
+    def get_chat_data(self):
+        return defaultdict(dict)
+
+    def get_bot_data(self):
+        return {}
+
+    def get_conversations(self, name):
+        if name not in self._conversations:
+            def load(key):
+                return BotConversation.objects.filter(
+                    name=name,
+                    key=_conversation_key(key)
+                ).values_list('state', flat=True).first()
+            self._conversations[name] = LazyConversations(load)
+        return self._conversations[name]
+
+    def update_conversation(self, name, key, new_state):
+        with self._lock:
+            self._dirty_conversations[(name, _conversation_key(key))] = new_state
+
+    def update_user_data(self, user_id, data):
+        try:
+            snapshot = _snapshot(data)
+        except (TypeError, ValueError) as e:
+            print(f"user_data пользователя {user_id} не сохранены: {str(e)}")
+            return
+        except RuntimeError:
+            # Словарь меняется в другом потоке - сохраним при следующем обновлении
+            return
+        with self._lock:
+            if self._saved_user_data.get(user_id) == snapshot:
+                return
+            self._saved_user_data[user_id] = snapshot
+            self._dirty_user_data[user_id] = snapshot
+
+    def update_chat_data(self, chat_id, data):
+        pass
+
+    def update_bot_data(self, data):
+        pass
+
+    @transaction.atomic
+    def _write(self, user_data, conversations):
+        BotUserData.objects.bulk_create(
+            [BotUserData(telegram_id=user_id, data=json.loads(snapshot)) for user_id, snapshot in user_data.items()],
+            update_conflicts=True,
+            unique_fields=['telegram_id'],
+            update_fields=['data', 'updated_at']
+        )
+
+        finished = defaultdict(list)
+        states = []
+        for (name, key), state in conversations.items():
+            if state is None:
+                finished[name].append(key)
+            else:
+                states.append(BotConversation(name=name, key=key, state=state))
+        for name, keys in finished.items():
+            BotConversation.objects.filter(name=name, key__in=keys).delete()
+        BotConversation.objects.bulk_create(
+            states,
+            update_conflicts=True,
+            unique_fields=['name', 'key'],
+            update_fields=['state', 'updated_at']
+        )
+
+    def flush(self):
+        """Записывает накопленные изменения в базу"""
+        with self._flush_lock:
+            with self._lock:
+                user_data, self._dirty_user_data = self._dirty_user_data, {}
+                conversations, self._dirty_conversations = self._dirty_conversations, {}
+            if not user_data and not conversations:
+                return
+            try:
+                self._write(user_data, conversations)
+            except Exception as e:
+                print(f"Не удалось сохранить состояние бота: {str(e)}")
+                # Вернём в очередь то, что не перезаписано более новыми изменениями
+                with self._lock:
+                    for user_id, snapshot in user_data.items():
+                        self._dirty_user_data.setdefault(user_id, snapshot)
+                    for key, state in conversations.items():
+                        self._dirty_conversations.setdefault(key, state)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            finally:
+                connection.close()
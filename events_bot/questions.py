@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from events_bot.bot_client import get_bot
+from events_bot.broadcast import lease_deadline, send_with_retries
+from events_bot.models import Question
+
+_delivery_pool = ThreadPoolExecutor(
+    max_workers=settings.QUESTION_DELIVERY_WORKERS,
+    thread_name_prefix='question_delivery'
+)
+
+
+def claim_question(question_id):
+    """Занимает отправку вопроса одним UPDATE; False, если его уже отправляет другой процесс"""
+    return bool(Question.objects.filter(
+        Q(delivery_claimed_until__isnull=True) | Q(delivery_claimed_until__lt=timezone.now()),
+        pk=question_id,
+        is_delivered=False
+    ).update(delivery_claimed_until=lease_deadline()))
+
+
+def deliver_question(question_id):
+    """Отправляет спикеру сохранённый вопрос и отмечает его доставленным.
+
+    Если отправка не удалась, вопрос остаётся занятым до конца аренды:
+    следующая попытка будет не раньше, чем через DELIVERY_LEASE_TIMEOUT.
+    """
+    try:
+        if not claim_question(question_id):
+            return
+        question = Question.objects.select_related('speaker', 'participant').get(pk=question_id)
+
+        reply_markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton("✅ Ответить", callback_data=f'answer_{question.id}')]
+        ])
+        error = send_with_retries(
+            get_bot(),
+            question.speaker.telegram_id,
+            f"❓ Новый вопрос от {question.participant.name}:\n\n{question.text}",
+            reply_markup=reply_markup
+        )
+        if not error:
+            Question.objects.filter(pk=question_id).update(is_delivered=True, delivery_claimed_until=None)
+    except Exception as e:
+        print(f"Не удалось доставить вопрос {question_id}: {str(e)}")
+    finally:
+        connection.close()
+
+
+def enqueue_question(question_id):
+    _delivery_pool.submit(deliver_question, question_id)
+
+
+def resume_question_delivery():
+    """Досылает вопросы, не доставленные из-за сбоя или перезапуска бота"""
+    undelivered = Question.objects.filter(
+        Q(delivery_claimed_until__isnull=True) | Q(delivery_claimed_until__lt=timezone.now()),
+        is_delivered=False,
+        event__is_active=True,
+        speaker__telegram_id__isnull=False
+    )
+    for question_id in undelivered.values_list('id', flat=True):
+        enqueue_question(question_id)
+
+
+def resume_question_delivery_job(context):
+    """Задача JobQueue: досылка вопросов; отправку каждого забирает один процесс"""
+    try:
+        resume_question_delivery()
+    except Exception as e:
+        print(f"Не удалось дослать вопросы: {str(e)}")
+    finally:
+        connection.close()
+
+
+def schedule_question_delivery(job_queue):
+    job_queue.run_repeating(
+        resume_question_delivery_job,
+        interval=settings.DELIVERY_LEASE_TIMEOUT,
+        first=0,
+        name='resume_question_delivery'
+    )
@@ -0,0 +1,236 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from events_bot.models import Participant, ProfileRecommendation
+
+TOKEN_RE = re.compile(r'\w+')
+# Грубый стемминг для русского: "разработчик" и "разработка" дают одну основу
+STEM_LENGTH = 6
+MIN_TOKEN_LENGTH = 3
+# Слова, которые есть почти в каждой анкете, ничего не говорят о сходстве
+MAX_DOCUMENT_FREQUENCY = 0.5
+# Сколько участников пересборка записывает за одну транзакцию
+REBUILD_CHUNK_SIZE = 500
+
+
+def tokenize(text):
+    return [
+        token[:STEM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if len(token) >= MIN_TOKEN_LENGTH and not token.isdigit()
+    ]
+
+
+class BioIndex:
+    """TF-IDF векторы анкет в виде обратного индекса (термин -> анкеты с весами).
+
+    Косинусное сходство анкеты со всеми остальными считается обходом списков
+    только её терминов, без построения полной матрицы. Анкеты можно добавлять
+    по одной: idf берётся из последней полной сборки, поэтому веса старых
+    анкет не пересчитываются.
+    """
+
+    def __init__(self, bios):
+        bios = dict(bios)
+        self.document_count = len(bios)
+        term_counts = {pk: Counter(tokenize(bio)) for pk, bio in bios.items()}
+        document_frequency = Counter(term for counts in term_counts.values() for term in counts)
+        max_frequency = max(2, MAX_DOCUMENT_FREQUENCY * self.document_count)
+        self.common_terms = {
+            term for term, frequency in document_frequency.items() if frequency > max_frequency
+        }
+        self.idf = {
+            term: math.log((self.document_count + 1) / (frequency + 1)) + 1
+            for term, frequency in document_frequency.items()
+        }
+        self.bio_hashes = {pk: hash(bio) for pk, bio in bios.items()}
+        self.vectors = {}
+        self.postings = defaultdict(dict)
+        for pk, counts in term_counts.items():
+            self._store(pk, self._vectorize(counts))
+
+    def _vectorize(self, counts):
+        # Термины, которых не было при сборке, получают максимальный idf
+        default_idf = math.log(self.document_count + 1) + 1
+        vector = {
+            term: (1 + math.log(count)) * self.idf.get(term, default_idf)
+            for term, count in counts.items()
+            if term not in self.common_terms
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    def _store(self, pk, vector):
+        self.vectors[pk] = vector
+        for term, weight in vector.items():
+            self.postings[term][pk] = weight
+
+    def remove(self, pk):
+        for term in self.vectors.pop(pk, {}):
+            self.postings[term].pop(pk, None)
+        self.bio_hashes.pop(pk, None)
+
+    def update(self, pk, bio):
+        """Добавляет или заменяет анкету; False, если текст не изменился"""
+        if self.bio_hashes.get(pk) == hash(bio):
+            return False
+        self.remove(pk)
+        self.bio_hashes[pk] = hash(bio)
+        self._store(pk, self._vectorize(Counter(tokenize(bio))))
+        return True
+
+    def neighbours(self, pk, limit):
+        """До limit самых похожих анкет: список (сходство, id)"""
+        scores = defaultdict(float)
+        for term, weight in self.vectors.get(pk, {}).items():
+            for other_pk, other_weight in self.postings[term].items():
+                scores[other_pk] += weight * other_weight
+        scores.pop(pk, None)
+        return heapq.nlargest(limit, ((score, other_pk) for other_pk, score in scores.items()))
+
+
+def load_bios():
+    return Participant.objects.filter(bio__isnull=False).exclude(bio='').values_list(
+        'pk', 'bio'
+    ).iterator(chunk_size=2000)
+
+
+def _recommendation_rows(pk, neighbours):
+    return [
+        ProfileRecommendation(participant_id=pk, candidate_id=candidate_pk, rank=rank, score=score)
+        for rank, (score, candidate_pk) in enumerate(neighbours, start=1)
+    ]
+
+
+class Recommender:
+    """Хранит индекс анкет и таблицу ProfileRecommendation в актуальном состоянии"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._index = None
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recommendations')
+
+    def rebuild(self):
+        """Полная пересборка: индекс и списки рекомендаций для всех анкет.
+
+        Соседи считаются вне транзакции, а таблица обновляется короткими
+        транзакциями по REBUILD_CHUNK_SIZE участников: пересборка не держит
+        блокировку SQLite на запись, и обработчики бота не получают
+        "database is locked". Неизменившиеся списки не перезаписываются.
+        """
+        index = BioIndex(load_bios())
+        neighbours = {pk: index.neighbours(pk, self.limit) for pk in index.vectors}
+
+        pks = list(neighbours)
+        for start in range(0, len(pks), REBUILD_CHUNK_SIZE):
+            self._write_chunk({pk: neighbours[pk] for pk in pks[start:start + REBUILD_CHUNK_SIZE]})
+
+        # Участники, у которых больше нет анкеты
+        stale = list(set(
+            ProfileRecommendation.objects.values_list('participant_id', flat=True).distinct()
+        ) - neighbours.keys())
+        for start in range(0, len(stale), REBUILD_CHUNK_SIZE):
+            ProfileRecommendation.objects.filter(
+                participant_id__in=stale[start:start + REBUILD_CHUNK_SIZE]
+            ).delete()
+
+        with self._lock:
+            self._index = index
+        return len(index.vectors)
+
+    def _write_chunk(self, neighbours):
+        current = defaultdict(list)
+        for participant_id, candidate_id, score in ProfileRecommendation.objects.filter(
+            participant_id__in=neighbours
+        ).order_by('participant_id', 'rank').values_list('participant_id', 'candidate_id', 'score'):
+            current[participant_id].append((round(score, 6), candidate_id))
+        changed = [
+            pk for pk, items in neighbours.items()
+            if current[pk] != [(round(score, 6), candidate_pk) for score, candidate_pk in items]
+        ]
+        if not changed:
+            return
+        rows = [row for pk in changed for row in _recommendation_rows(pk, neighbours[pk])]
+        with transaction.atomic():
+            ProfileRecommendation.objects.filter(participant_id__in=changed).delete()
+            ProfileRecommendation.objects.bulk_create(rows)
+
+    def update_profile(self, pk):
+        """Пересчитывает рекомендации для анкеты pk и добавляет её в списки похожих"""
+        bio = Participant.objects.filter(pk=pk).values_list('bio', flat=True).first()
+        with self._lock:
+            if self._index is None:
+                self._index = BioIndex(load_bios())
+            index = self._index
+            if not bio:
+                index.remove(pk)
+                ProfileRecommendation.objects.filter(participant_id=pk).delete()
+                return
+            if not index.update(pk, bio):
+                return
+
+            neighbours = index.neighbours(pk, self.limit)
+            with transaction.atomic():
+                ProfileRecommendation.objects.filter(candidate_id=pk).delete()
+                ProfileRecommendation.objects.filter(participant_id=pk).delete()
+                ProfileRecommendation.objects.bulk_create(_recommendation_rows(pk, neighbours))
+                for score, other_pk in neighbours:
+                    self._insert_candidate(other_pk, pk, score)
+
+    def _insert_candidate(self, pk, candidate_pk, score):
+        current = list(
+            ProfileRecommendation.objects.filter(participant_id=pk).values_list('score', 'candidate_id')
+        )
+        if len(current) >= self.limit and score <= min(current)[0]:
+            return
+        neighbours = heapq.nlargest(self.limit, current + [(score, candidate_pk)])
+        ProfileRecommendation.objects.filter(participant_id=pk).delete()
+        ProfileRecommendation.objects.bulk_create(_recommendation_rows(pk, neighbours))
+
+    def schedule_update(self, pk):
+        """Обновление в фоне, чтобы не задерживать обработчик"""
+        self._executor.submit(self._run_update, pk)
+
+    def schedule_rebuild(self):
+        self._executor.submit(self._run_rebuild)
+
+    def _run_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"Не удалось пересобрать рекомендации: {str(e)}")
+        finally:
+            connection.close()
+
+    def _run_update(self, pk):
+        try:
+            self.update_profile(pk)
+        except Exception as e:
+            print(f"Не удалось обновить рекомендации: {str(e)}")
+        finally:
+            connection.close()
+
+
+recommender = Recommender(settings.RECOMMENDATIONS_PER_PARTICIPANT)
+
+
+def rebuild_recommendations_job(context):
+    """Задача JobQueue: периодическая пересборка рекомендаций в фоне"""
+    recommender.schedule_rebuild()
+
+
+def schedule_recommendations_rebuild(job_queue):
+    job_queue.run_repeating(
+        rebuild_recommendations_job,
+        interval=settings.RECOMMENDATIONS_REBUILD_INTERVAL,
+        first=0,
+        name='rebuild_recommendations'
+    )
@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from events_bot.models import Donation
+from events_bot.payments import PaymentError, PaymentGatewayError, yookassa_client
+
+
+class DonationReconciler:
+    """Сверяет неподтверждённые донаты со статусами платежей в ЮKassa.
+
+    Донаты выбираются порциями по id, статусы запрашиваются несколькими
+    потоками, изменения записываются одним bulk_update на порцию.
+    Если ЮKassa недоступна, проход прерывается, а пауза до
+    следующего прохода удваивается (до max_backoff).
+    """
+
+    def __init__(self, client, batch_size, interval, max_backoff):
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.delay = interval
+
+    def _pending_donations(self):
+        pending = Donation.objects.filter(
+            is_confirmed=False,
+            is_canceled=False,
+            payment_id__isnull=False
+        ).only('id', 'payment_id', 'is_confirmed', 'is_canceled').order_by('id')
+        last_id = 0
+        while True:
+            chunk = list(pending.filter(id__gt=last_id)[:self.batch_size])
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1].id
+
+    def _fetch_status(self, donation):
+        try:
+            return donation, self.client.get_payment(donation.payment_id).status, None
+        except PaymentGatewayError as e:
+            return donation, None, e
+        except PaymentError as e:
+            # Платёж не найден и т.п. - сверять нечего, ЮKassa при этом работает
+            print(f"Не удалось проверить платёж {donation.payment_id}: {str(e)}")
+            return donation, None, None
+
+    def run(self):
+        """Один проход сверки; возвращает (подтверждено, отменено, ошибок)"""
+        confirmed = canceled = errors = 0
+        with ThreadPoolExecutor(max_workers=settings.YOOKASSA_WORKERS) as pool:
+            for chunk in self._pending_donations():
+                changed = []
+                for donation, status, error in pool.map(self._fetch_status, chunk):
+                    if error is not None:
+                        errors += 1
+                    elif status == 'succeeded':
+                        donation.is_confirmed = True
+                        changed.append(donation)
+                        confirmed += 1
+                    elif status == 'canceled':
+                        donation.is_canceled = True
+                        changed.append(donation)
+                        canceled += 1
+                Donation.objects.bulk_update(changed, ['is_confirmed', 'is_canceled'])
+                if errors:
+                    break
+
+        if errors:
+            self.delay = min(self.delay * 2, self.max_backoff)
+        else:
+            self.delay = self.interval
+        return confirmed, canceled, errors
+
+
+donation_reconciler = DonationReconciler(
+    yookassa_client,
+    batch_size=settings.DONATION_RECONCILE_BATCH_SIZE,
+    interval=settings.DONATION_RECONCILE_INTERVAL,
+    max_backoff=settings.DONATION_RECONCILE_MAX_BACKOFF
+)
+
+
+def reconcile_donations_job(context):
+    """Задача JobQueue: сверяет донаты и планирует следующий проход"""
+    try:
+        confirmed, canceled, errors = donation_reconciler.run()
+        if errors:
+            print(f"Сверка донатов прервана: {errors} ошибок ЮKassa, "
+                  f"следующая попытка через {donation_reconciler.delay} с")
+    except Exception as e:
+        print(f"Ошибка сверки донатов: {str(e)}")
+    finally:
+        connection.close()
+    context.job_queue.run_once(
+        reconcile_donations_job,
+        donation_reconciler.delay,
+        name='reconcile_donations'
+    )
+
+
+def schedule_donation_reconciliation(job_queue):
+    job_queue.run_once(
+        reconcile_donations_job,
+        settings.DONATION_RECONCILE_INTERVAL,
+        name='reconcile_donations'
+    )
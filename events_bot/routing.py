@@ -0,0 +1,23 @@
+from telegram import Update
+from telegram.ext import Handler
+
+
+class MenuRouter(Handler):
+    """Обработчик кнопок меню.
+
+    Сопоставляет текст сообщения с обработчиком одним поиском по словарю,
+    вместо проверки цепочки MessageHandler(Filters.regex(...)).
+    """
+
+    def __init__(self, routes):
+        super().__init__(callback=None)
+        self.routes = dict(routes)
+
+    def check_update(self, update):
+        if isinstance(update, Update) and update.message and update.message.text:
+            return self.routes.get(update.message.text)
+        return None
+
+    def handle_update(self, update, dispatcher, check_result, context=None):
+        self.collect_additional_context(context, update, dispatcher, check_result)
+        return check_result(update, context)
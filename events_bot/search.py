@@ -0,0 +1,130 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from events_bot.models import Participant, Question
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class SQLiteFTSBackend:
+    """Поиск через виртуальную таблицу FTS5 (<таблица модели>_fts, rowid = id записи)"""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.table = f'{model._meta.db_table}_fts'
+
+    @staticmethod
+    def _match_expression(query):
+        # Каждое слово ищется как префикс; кавычки не дают пользователю писать синтаксис FTS5
+        tokens = TOKEN_RE.findall(query)
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def reindex(self, pk):
+        columns = ', '.join(self.fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {self.table} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {self.model._meta.db_table} WHERE id = %s',
+                [pk]
+            )
+
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def filter(self, queryset, query):
+        match = self._match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [match]
+        ))
+
+    def search(self, queryset, query, limit):
+        match = self._match_expression(query)
+        if not match:
+            return []
+        # Ранжирует сам FTS5, queryset только ограничивает набор записей.
+        # "+rowid" не даёт SQLite перебирать записи queryset и для каждой
+        # заново выполнять MATCH: сначала поиск по индексу, потом проверка
+        subquery, params = queryset.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'AND +rowid IN ({subquery}) ORDER BY rank LIMIT %s',
+                [match, *params, limit]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        found = queryset.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+
+class LikeBackend:
+    """Запасной вариант для остальных СУБД: icontains по полям, без ранжирования"""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    def reindex(self, pk):
+        pass
+
+    def remove(self, pk):
+        pass
+
+    def filter(self, queryset, query):
+        condition = Q()
+        for token in TOKEN_RE.findall(query):
+            token_condition = Q()
+            for field in self.fields:
+                token_condition |= Q(**{f'{field}__icontains': token})
+            condition &= token_condition
+        return queryset.filter(condition) if condition else queryset.none()
+
+    def search(self, queryset, query, limit):
+        return list(self.filter(queryset, query)[:limit])
+
+
+class FullTextSearch:
+    """Полнотекстовый поиск по полям модели, не зависящий от СУБД.
+
+    Индекс обновляется сигналами моделей, поиск возвращает записи
+    в порядке релевантности (если СУБД это умеет).
+    """
+
+    backends = {'sqlite': SQLiteFTSBackend}
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            backend_class = self.backends.get(connection.vendor, LikeBackend)
+            self._backend = backend_class(self.model, self.fields)
+        return self._backend
+
+    def reindex(self, pk):
+        self.backend.reindex(pk)
+
+    def remove(self, pk):
+        self.backend.remove(pk)
+
+    def filter(self, queryset, query):
+        """Записи queryset, подходящие под запрос (для поиска в админке)"""
+        return self.backend.filter(queryset, query)
+
+    def search(self, queryset, query, limit=10):
+        """Не больше limit самых релевантных записей queryset"""
+        return self.backend.search(queryset, query, limit)
+
+
+question_search = FullTextSearch(Question, ['text'])
+participant_search = FullTextSearch(Participant, ['name', 'bio'])
@@ -1,16 +1,95 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.conf import settings
-from telegram.ext import Updater
-from events_bot.models import Event, Participant
-from events_bot.telegram_bot import send_new_event_notification
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from events_bot.models import Event, Participant, Question, Speaker, TimeSlot
+from events_bot.notifications import postpone_announcement, schedule_announcement
+from events_bot.participants import participant_cache
+from events_bot.recommendations import recommender
+from events_bot.search import participant_search, question_search
+from events_bot.keyboards import events_keyboard
+from events_bot.snapshots import active_events
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Настройки SQLite для одновременной работы бота, воркеров и админки"""
+    if connection.vendor != 'sqlite':
+        return
+    timeout = settings.DATABASES[connection.alias].get('OPTIONS', {}).get('timeout', 5)
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}')
+        cursor.execute(f'PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA busy_timeout = {int(timeout * 1000)}')
+        if settings.SQLITE_JOURNAL_MODE.lower() == 'wal':
+            # С журналом отката mmap при записи из нескольких процессов портил базу
+            cursor.execute(f'PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}')
+
 
 @receiver(post_save, sender=Event)
 def notify_new_event(sender, instance, created, **kwargs):
-    """Отправление уведомлений о новых событиях"""
+    """Анонс нового мероприятия: время отправки записывается в той же транзакции,
+    а рассылает его JobQueue процесса бота"""
     if created:
-        try:
-            updater = Updater(settings.TG_BOT_TOKEN, use_context=True)
-            sent_count = send_new_event_notification(updater.bot, instance)
-        except Exception as e:
-            print(f"Не удалось выслать уведомление: {str(e)}")
\ No newline at end of file
+        schedule_announcement(instance.pk)
+
+
+@receiver(post_save, sender=TimeSlot)
+def postpone_new_event_notification(sender, instance, **kwargs):
+    """Слоты сохраняются после мероприятия - ждём, пока программа будет готова"""
+    postpone_announcement(instance.event_id)
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def invalidate_participant_cache(sender, instance, **kwargs):
+    """Сброс закэшированного участника после изменения"""
+    participant_cache.invalidate(instance.telegram_id)
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def update_profile_recommendations(sender, instance, **kwargs):
+    """Пересчёт похожих анкет (если «О себе» не менялось, ничего не делает)"""
+    participant_id = instance.pk
+    transaction.on_commit(lambda: recommender.schedule_update(participant_id))
+
+
+@receiver(post_save, sender=Participant)
+def index_participant(sender, instance, **kwargs):
+    participant_search.reindex(instance.pk)
+
+
+@receiver(post_delete, sender=Participant)
+def unindex_participant(sender, instance, **kwargs):
+    participant_search.remove(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    question_search.reindex(instance.pk)
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, **kwargs):
+    question_search.remove(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_keyboards(sender, instance, **kwargs):
+    """Пересборка клавиатуры мероприятий после их изменения"""
+    transaction.on_commit(events_keyboard.invalidate)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(post_save, sender=Speaker)
+@receiver(post_delete, sender=Speaker)
+@receiver(m2m_changed, sender=Speaker.events.through)
+def invalidate_active_events(sender, **kwargs):
+    """Перезагрузка активного мероприятия (и его программы) после изменения его данных"""
+    transaction.on_commit(active_events.invalidate)
@@ -0,0 +1,69 @@
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from events_bot.models import Event, TimeSlot
+
+
+class Snapshot:
+    """Данные в памяти процесса, которые загружаются один раз.
+
+    Перезагружаются после invalidate() (вызывается сигналами моделей) или
+    по истечении ttl: сигналы из админки в другом процессе сюда не доходят.
+    """
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0
+        self._version = 0
+        self._lock = Lock()
+        self._load_lock = Lock()
+
+    def get(self):
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return self._value
+
+        # Загружает только один поток, остальные ждут готовое значение
+        with self._load_lock:
+            with self._lock:
+                if time.monotonic() < self._expires_at:
+                    return self._value
+                version = self._version
+
+            value = self.loader()
+
+            with self._lock:
+                # Если данные поменялись во время загрузки, не сохраняем устаревшее
+                if version == self._version:
+                    self._value = value
+                    self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._expires_at = 0
+
+
+def load_active_events():
+    """Активные мероприятия вместе со спикерами и слотами"""
+    return list(
+        Event.objects.filter(is_active=True).order_by('date', 'pk').prefetch_related(
+            'speakers',
+            Prefetch('time_slots', queryset=TimeSlot.objects.select_related('speaker'))
+        )
+    )
+
+
+active_events = Snapshot(load_active_events, ttl=settings.SNAPSHOT_TTL)
+
+
+def get_active_event():
+    """Текущее активное мероприятие или None (без запросов к БД)"""
+    events = active_events.get()
+    return events[0] if events else None
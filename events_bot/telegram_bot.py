@@ -1,5 +1,7 @@
 from telegram.ext import (
     Updater,
+    JobQueue,
+    ContextTypes,
     CommandHandler,
     CallbackQueryHandler,
     MessageHandler,
@@ -9,18 +11,40 @@ from telegram.ext import (
 from telegram import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
-    ReplyKeyboardMarkup,
     BotCommand,
     Update,
     ReplyKeyboardRemove
 )
 from django.conf import settings
-from yookassa import Payment, Configuration
 import uuid
+from html import escape
+from queue import Queue
+from django.db import connection
 from django.utils import timezone
 
-from events_bot.models import Event, Participant, Donation, Question, Speaker
+from events_bot.models import Event, Participant, Donation, Question, Speaker, ProfileRecommendation
 from events_bot.views import send_question
+from events_bot.bot_client import get_bot
+from events_bot.dispatcher import ChatOrderedDispatcher
+from events_bot.workers import PartitionedDispatcher
+from events_bot.routing import MenuRouter
+from events_bot.payments import PaymentError, yookassa_client
+from events_bot.reconciliation import schedule_donation_reconciliation
+from events_bot.recommendations import recommender, schedule_recommendations_rebuild
+from events_bot.search import participant_search, question_search
+from events_bot.participants import BotContext, participant_cache
+from events_bot.persistence import DjangoPersistence
+from events_bot.snapshots import get_active_event
+from events_bot.broadcast import start_broadcast, schedule_broadcast_resume
+from events_bot.notifications import schedule_event_announcements
+from events_bot.questions import schedule_question_delivery
+from events_bot.keyboards import (
+    main_keyboard,
+    event_menu_keyboard,
+    get_events_keyboard,
+    REGISTRATION_KEYBOARD,
+    DONATE_KEYBOARD
+)
 
 (
     CHOOSE_CUSTOM_AMOUNT,
@@ -42,83 +66,34 @@ from events_bot.views import send_question
     VIEWING_PROFILE
 ) = range(17)
 
-# Инициализация ЮKassa
-Configuration.account_id = settings.YOOKASSA_SHOP_ID
-Configuration.secret_key = settings.YOOKASSA_SECRET_KEY
-
-
 def get_main_keyboard(participant):
     """Кнопки главного меню"""
-    keyboard = [
-        ["📅 Мероприятие", "📝 Регистрация"],
-        ["🙋 Пообщаться", "🎁 Поддержать"]
-    ]
-
-    # Добавляем кнопку "Мои вопросы" только для спикеров
-    if participant.is_speaker:
-        keyboard.append(["❓ Мои вопросы"])
-
-    # Добавляем кнопку "Сделать рассылку" только для организаторов и спикеров
-    if participant.is_event_manager:
-        keyboard.append(["📢 Сделать рассылку"])
-
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=False)
+    return main_keyboard(participant.is_speaker, participant.is_event_manager)
 
 
 def event_menu(update, context):
     """Обработчик меню 'Мероприятие'"""
-    user = update.message.from_user
-    participant, _ = Participant.objects.get_or_create(
-        telegram_id=user.id,
-        defaults={
-            'telegram_username': user.username,
-            'name': user.first_name or 'Аноним'
-        }
-    )
-
-    keyboard = [
-        ["📜 Программа", "📋 Мои мероприятия"],
-        ["❓ Задать вопрос спикеру"],
-        ["🎤 Кто выступает сейчас?"],
-    ]
-
-    # Кнопка подписки/отписки
-    if not participant.is_subscribed:
-        keyboard.append(["🔙 Назад", "✅ Подписаться на рассылку"])
-    else:
-        keyboard.append(["🔙 Назад", "❌ Отписаться от рассылки"])
+    participant = context.get_or_create_participant()
 
     update.message.reply_text(
         "Выберите действие:",
-        reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+        reply_markup=event_menu_keyboard(participant.is_subscribed)
     )
 
 
 def registration_menu(update, context):
     """Обработчик меню 'Регистрация'"""
-    keyboard = [
-        ["👤 Зарегистрироваться участником"],
-        ["🎤 Зарегистрироваться спикером"],
-        ["🔙 Назад"]
-    ]
-
     update.message.reply_text(
         "Выберите тип регистрации:",
-        reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+        reply_markup=REGISTRATION_KEYBOARD
     )
 
 
 def start(update, context):
     user = update.message.from_user
-    participant, _ = Participant.objects.get_or_create(
-        telegram_id=user.id,
-        defaults={
-            'telegram_username': user.username,
-            'name': user.first_name or 'Аноним'
-        }
-    )
+    participant = context.get_or_create_participant()
 
-    event = Event.objects.filter(is_active=True).first()
+    event = get_active_event()
     event_name = event.title if event else "Python Meetup"
 
     main_menu_keyboard = get_main_keyboard(participant)
@@ -138,7 +113,7 @@ def start(update, context):
 
 
 def program(update, context):
-    event = Event.objects.filter(is_active=True).first()
+    event = get_active_event()
     if event:
         program_text = event.get_program()
         update.message.reply_text(
@@ -156,7 +131,7 @@ def program(update, context):
 
 
 def donate(update, context):
-    if not Event.objects.filter(is_active=True).exists():
+    if get_active_event() is None:
         update.message.reply_text(
             "🙅‍♂️ <b>Сейчас нет активных мероприятий</b>\n"
             "Донаты временно недоступны",
@@ -164,17 +139,10 @@ def donate(update, context):
         )
         return
 
-    keyboard = [
-        [InlineKeyboardButton("💵 100 ₽", callback_data='donate_100')],
-        [InlineKeyboardButton("💵 300 ₽", callback_data='donate_300')],
-        [InlineKeyboardButton("💵 500 ₽", callback_data='donate_500')],
-        [InlineKeyboardButton(
-            "✨ Другая сумма", callback_data='donate_custom')],
-    ]
     update.message.reply_text(
         "🎁 <b>Выберите сумму доната:</b>\n"
         "Ваша поддержка помогает развивать комьюнити!",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=DONATE_KEYBOARD,
         parse_mode='HTML'
     )
 
@@ -183,7 +151,7 @@ def handle_fixed_donate_callback(update, context):
     query = update.callback_query
     query.answer()
 
-    if not Event.objects.filter(is_active=True).exists():
+    if get_active_event() is None:
         query.edit_message_text(
             "🙅‍♂️ Сейчас нет активных мероприятий для доната")
         return ConversationHandler.END
@@ -200,7 +168,7 @@ def handle_custom_donate_callback(update, context):
     query = update.callback_query
     query.answer()
 
-    if not Event.objects.filter(is_active=True).exists():
+    if get_active_event() is None:
         query.edit_message_text(
             "🙅‍♂️ Сейчас нет активных мероприятий для доната")
         return ConversationHandler.END
@@ -248,12 +216,10 @@ def cancel(update, context):
 def create_payment(update, context, amount):
     if update.callback_query:
         user = update.callback_query.from_user
-        chat_id = update.callback_query.message.chat_id
     else:
         user = update.message.from_user
-        chat_id = update.message.chat_id
 
-    event = Event.objects.filter(is_active=True).first()
+    event = get_active_event()
     if not event:
         error_msg = "🙅‍♂️ Сейчас нет активных мероприятий для доната"
         if update.callback_query:
@@ -262,44 +228,59 @@ def create_payment(update, context, amount):
             update.message.reply_text(error_msg)
         return
 
-    participant, _ = Participant.objects.get_or_create(
-        telegram_id=user.id,
-        defaults={
-            'telegram_username': user.username,
-            'name': user.first_name or 'Аноним'
+    participant = context.get_or_create_participant()
+
+    waiting_text = "⏳ Создаём платёж..."
+    if update.callback_query:
+        update.callback_query.edit_message_text(waiting_text)
+        message = update.callback_query.message
+    else:
+        message = update.message.reply_text(waiting_text)
+
+    params = {
+        "amount": {"value": str(amount), "currency": "RUB"},
+        "confirmation": {
+            "type": "redirect",
+            "return_url": f"https://t.me/{settings.TG_BOT_USERNAME}"
+        },
+        # Без автоматического списания платёж остановится в waiting_for_capture
+        "capture": True,
+        "description": f"Донат на {event.title}",
+        "metadata": {
+            "user_id": user.id,
+            "event_id": event.id
         }
+    }
+    # Ответ ЮKassa ждёт пул платежей, а не обработчик обновлений
+    try:
+        future = yookassa_client.submit_payment(params, str(uuid.uuid4()))
+    except PaymentError as e:
+        message.edit_text(f"❌ <b>Ошибка при создании платежа</b>\n{str(e)}", parse_mode='HTML')
+        return
+    future.add_done_callback(
+        lambda future: finish_payment(future, context.bot, message, user, event, participant, amount)
     )
 
+
+def finish_payment(future, bot, message, user, event, participant, amount):
+    """Отправляет ссылку на оплату, когда ЮKassa создала платёж"""
     try:
-        payment = Payment.create({
-            "amount": {"value": str(amount), "currency": "RUB"},
-            "confirmation": {
-                "type": "redirect",
-                "return_url": f"https://t.me/{settings.TG_BOT_USERNAME}"
-            },
-            "description": f"Донат на {event.title}",
-            "metadata": {
-                "user_id": user.id,
-                "event_id": event.id
-            }
-        }, str(uuid.uuid4()))
+        payment = future.result()
 
         Donation.objects.create(
             event=event,
             participant=participant,
             amount=amount,
-            payment_id=payment.id,
-            is_confirmed=True
+            payment_id=payment.id
         )
 
-        context.bot.send_message(
-            chat_id=chat_id,
-            text=f"✨ <b>Спасибо, что решили поддержать мероприятие, {user.first_name}!</b>\n\n"
-                 f"Ваш донат {amount}₽ — это:\n"
-                 f"• ☕ 10 чашек кофе для спикеров\n"
-                 f"• 📚 Новые материалы для участников\n"
-                 f"• 💻 Лучшее оборудование для трансляций\n\n"
-                 f"<i>Спасибо за вклад в развитие комьюнити!</i>",
+        message.edit_text(
+            f"✨ <b>Спасибо, что решили поддержать мероприятие, {user.first_name}!</b>\n\n"
+            f"Ваш донат {amount}₽ — это:\n"
+            f"• ☕ 10 чашек кофе для спикеров\n"
+            f"• 📚 Новые материалы для участников\n"
+            f"• 💻 Лучшее оборудование для трансляций\n\n"
+            f"<i>Спасибо за вклад в развитие комьюнити!</i>",
             parse_mode='HTML'
         )
 
@@ -307,26 +288,21 @@ def create_payment(update, context, amount):
             "💳 Перейти к оплате",
             url=payment.confirmation.confirmation_url
         )]])
-
-        message = f"<b>Для оплаты {amount} ₽</b>\nНажмите кнопку ниже:"
-        if update.callback_query:
-            update.callback_query.edit_message_text(
-                message, reply_markup=reply_markup, parse_mode='HTML')
-        else:
-            context.bot.send_message(
-                chat_id, message, reply_markup=reply_markup, parse_mode='HTML')
+        bot.send_message(
+            message.chat_id,
+            f"<b>Для оплаты {amount} ₽</b>\nНажмите кнопку ниже:",
+            reply_markup=reply_markup,
+            parse_mode='HTML'
+        )
 
     except Exception as e:
-        error_msg = f"❌ <b>Ошибка при создании платежа</b>\n{str(e)}"
-        if update.callback_query:
-            update.callback_query.edit_message_text(
-                error_msg, parse_mode='HTML')
-        else:
-            context.bot.send_message(chat_id, error_msg, parse_mode='HTML')
+        message.edit_text(f"❌ <b>Ошибка при создании платежа</b>\n{str(e)}", parse_mode='HTML')
+    finally:
+        connection.close()
 
 
 def current_speaker(update, context):
-    event = Event.objects.filter(is_active=True).first()
+    event = get_active_event()
     if not event:
         update.message.reply_text(
             "📭 Сейчас нет активных мероприятий",
@@ -334,8 +310,10 @@ def current_speaker(update, context):
         )
         return
 
-    now = timezone.localtime(timezone.now())
+    now = timezone.now()
+    timeline = event.get_timeline()
     current_slot = event.get_current_speaker()
+    next_slot = timeline.next(now)
 
     if current_slot:
         speaker = current_slot.speaker
@@ -354,6 +332,20 @@ def current_speaker(update, context):
             f"ℹ️ {speaker.bio if speaker.bio else 'Нет дополнительной информации'}",
             parse_mode='HTML'
         )
+    elif next_slot:
+        minutes_left = int(timeline.until_next(now).total_seconds() // 60)
+        hours, minutes = divmod(minutes_left, 60)
+        wait_text = f"{hours} ч {minutes} мин" if hours else f"{minutes} мин"
+        start_time = timezone.localtime(next_slot.start_time)
+
+        update.message.reply_text(
+            f"⏳ <b>Сейчас перерыв</b>\n\n"
+            f"Следующее выступление через {wait_text}:\n"
+            f"👤 <b>{next_slot.speaker.name}</b>\n"
+            f"📢 <i>{next_slot.title}</i>\n"
+            f"🕒 {start_time.strftime('%H:%M')}",
+            parse_mode='HTML'
+        )
     else:
         update.message.reply_text(
             "⏳ <b>Сейчас перерыв или выступление не запланировано</b>\n\n"
@@ -365,9 +357,9 @@ def current_speaker(update, context):
 def get_ask_speaker_keyboard(speakers):
     """Клавиатура для выбора спикера с отметкой текущего"""
     keyboard = []
-    event = Event.objects.filter(is_active=True).first()
-    current_speaker = event.get_current_speaker(
-    ).speaker if event and event.get_current_speaker() else None
+    event = get_active_event()
+    current_slot = event.get_current_speaker() if event else None
+    current_speaker = current_slot.speaker if current_slot else None
 
     for speaker in speakers:
         if speaker.telegram_username:
@@ -384,7 +376,7 @@ def get_ask_speaker_keyboard(speakers):
 
 def ask_speaker_start(update, context):
     """Начало процесса задания вопроса"""
-    event = Event.objects.filter(is_active=True).first()
+    event = get_active_event()
     if not event:
         update.message.reply_text("Сейчас нет активных мероприятий")
         return ConversationHandler.END
@@ -409,7 +401,7 @@ def ask_speaker_select(update, context):
     if query.data == 'back':
         user = query.from_user
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             query.edit_message_text(
                 "Выберите действие:", reply_markup=get_main_keyboard(participant))
         except Participant.DoesNotExist:
@@ -544,25 +536,11 @@ def show_unanswered_questions(update, context):
         update.message.reply_text("Вы не зарегистрированы как спикер.")
 
 
-def get_events_keyboard():
-    """Клавиатура с активными и будущими мероприятиями"""
-    events = Event.objects.filter(date__gte=timezone.now()).order_by('date')
-    keyboard = [
-        [InlineKeyboardButton(
-            event.get_full_name(),
-            callback_data=f"event_{event.id}"
-        )]
-        for event in events
-    ]
-    keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data='cancel')])
-    return InlineKeyboardMarkup(keyboard)
-
-
 def register_speaker_start(update, context):
     """Начало процесса регистрации спикера"""
     user = update.effective_user
     try:
-        participant = Participant.objects.get(telegram_id=user.id)
+        participant = context.get_participant()
     except Participant.DoesNotExist:
         update.message.reply_text(
             "❌ Пожалуйста, начните с команды /start",
@@ -597,7 +575,7 @@ def register_speaker_select_event(update, context):
 
     event_id = int(query.data.split('_')[1])
     event = Event.objects.get(id=event_id)
-    context.user_data['register_event'] = event
+    context.user_data['register_event_id'] = event.id
 
     query.edit_message_text(
         f"Подтвердите регистрацию как спикера на:\n"
@@ -622,7 +600,7 @@ def register_speaker_confirm(update, context):
 
     if query.data == 'confirm':
         try:
-            event = context.user_data['register_event']
+            event = Event.objects.get(id=context.user_data['register_event_id'])
 
             # Создаем или обновляем спикера
             speaker, created = Speaker.objects.update_or_create(
@@ -665,7 +643,7 @@ def subscribe_start(update, context):
     user = update.effective_user
 
     try:
-        participant = Participant.objects.get(telegram_id=user.id)
+        participant = context.get_participant()
 
         if participant.is_subscribed:
             update.message.reply_text(
@@ -707,9 +685,11 @@ def subscribe_confirm(update, context):
 
     if query.data == 'subscribe_confirm':
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
+            # Участник из кэша мог устареть: пишем только флаг подписки, а не всю строку
             participant.is_subscribed = True
-            participant.save()
+            Participant.objects.filter(pk=participant.pk).update(is_subscribed=True)
+            participant_cache.invalidate(participant.telegram_id)
             query.edit_message_text(  # Edit to clear inline buttons
                 "✅ Подписка подтверждена",
                 parse_mode='HTML'
@@ -735,7 +715,7 @@ def subscribe_confirm(update, context):
             )
     else:
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             context.bot.send_message(
                 chat_id=chat_id,
                 text="❌ Действие отменено",
@@ -762,9 +742,9 @@ def mailing_start(update, context):
     query = update.callback_query
     user = update.effective_user
     try:
-        participant = Participant.objects.get(telegram_id=user.id)
+        participant = context.get_participant()
 
-        if not (participant.is_speaker or participant.is_manager):
+        if not (participant.is_speaker or participant.is_event_manager):
             update.message.reply_text(
                 "❌ <b>У вас нет прав для создания рассылки.</b>\n"
                 "Эта функция доступна только спикерам и менеджерам.",
@@ -817,7 +797,7 @@ def mailing_confirm(update, context):
 
     if query.data == 'mailing_confirm':
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             mailing_text = context.user_data['mailing_text']
             subscribed_participants = Participant.objects.filter(
                 is_subscribed=True)
@@ -835,28 +815,25 @@ def mailing_confirm(update, context):
                 )
                 return ConversationHandler.END
 
-            sent_count = 0
-            for participant in subscribed_participants:
-                try:
-                    context.bot.send_message(
-                        chat_id=participant.telegram_id,
-                        text=f"📢 <b>Новое сообщение от организаторов:</b>\n\n{mailing_text}",
-                        parse_mode='HTML'
-                    )
-                    sent_count += 1
-                except Exception as e:
-                    print(
-                        f"Failed to send message to {participant.telegram_id}: {str(e)}")
+            query.edit_message_text("📤 Рассылка запущена...")
+            main_keyboard = get_main_keyboard(participant)
 
-            query.edit_message_text(
-                "✅ Рассылка отправлена",
-                parse_mode='HTML'
-            )
-            context.bot.send_message(
-                chat_id=chat_id,
-                text=f"✅ <b>Рассылка успешно отправлена {sent_count} подписчикам!</b>",
-                parse_mode='HTML',
-                reply_markup=get_main_keyboard(participant)
+            def report_done(broadcast):
+                context.bot.send_message(
+                    chat_id=chat_id,
+                    text=f"✅ <b>Рассылка завершена!</b>\n"
+                         f"Доставлено: {broadcast.sent} из {broadcast.total}",
+                    parse_mode='HTML',
+                    reply_markup=main_keyboard
+                )
+
+            start_broadcast(
+                context.bot,
+                f"📢 <b>Новое сообщение от организаторов:</b>\n\n{mailing_text}",
+                subscribed_participants,
+                progress_chat_id=chat_id,
+                progress_message_id=query.message.message_id,
+                on_done=report_done
             )
         except Participant.DoesNotExist:
             query.edit_message_text(
@@ -871,7 +848,7 @@ def mailing_confirm(update, context):
             )
         except Exception as e:
             try:
-                participant = Participant.objects.get(telegram_id=user.id)
+                participant = context.get_participant()
                 query.edit_message_text(
                     "❌ Ошибка рассылки",
                     parse_mode='HTML'
@@ -895,7 +872,7 @@ def mailing_confirm(update, context):
                 )
     else:
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             context.bot.send_message(
                 chat_id=chat_id,
                 text="❌ Действие отменено",
@@ -922,7 +899,7 @@ def unsubscribe_start(update, context):
     user = update.effective_user
 
     try:
-        participant = Participant.objects.get(telegram_id=user.id)
+        participant = context.get_participant()
 
         if not participant.is_subscribed:
             update.message.reply_text(
@@ -964,9 +941,11 @@ def unsubscribe_confirm(update, context):
 
     if query.data == 'unsubscribe_confirm':
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
+            # Участник из кэша мог устареть: пишем только флаг подписки, а не всю строку
             participant.is_subscribed = False
-            participant.save()
+            Participant.objects.filter(pk=participant.pk).update(is_subscribed=False)
+            participant_cache.invalidate(participant.telegram_id)
             query.edit_message_text(  # Edit to clear inline buttons
                 "✅ Отписка подтверждена",
                 parse_mode='HTML'
@@ -991,7 +970,7 @@ def unsubscribe_confirm(update, context):
             )
     else:
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             context.bot.send_message(
                 chat_id=chat_id,
                 text="❌ Действие отменено",
@@ -1017,7 +996,7 @@ def register_participant_start(update, context):
     """Начало процесса регистрации участника"""
     user = update.effective_user
     try:
-        participant = Participant.objects.get(telegram_id=user.id)
+        participant = context.get_participant()
     except Participant.DoesNotExist:
         update.message.reply_text(
             "❌ Пожалуйста, начните с команды /start",
@@ -1049,8 +1028,7 @@ def register_participant_select_event(update, context):
 
     if query.data == 'cancel':
         try:
-            participant = Participant.objects.get(
-                telegram_id=query.from_user.id)
+            participant = context.get_participant()
             query.edit_message_text(
                 "❌ Регистрация отменена",
                 parse_mode='HTML'
@@ -1071,8 +1049,8 @@ def register_participant_select_event(update, context):
     event_id = int(query.data.split('_')[1])
     try:
         event = Event.objects.get(id=event_id)
-        context.user_data['participant_event'] = event
-        participant = Participant.objects.get(telegram_id=query.from_user.id)
+        context.user_data['participant_event_id'] = event.id
+        participant = context.get_participant()
 
         if event in participant.registered_events.all():
             query.edit_message_text(
@@ -1117,7 +1095,7 @@ def register_participant_confirm(update, context):
 
     if query.data == 'confirm':
         try:
-            event = context.user_data['participant_event']
+            event = Event.objects.get(id=context.user_data['participant_event_id'])
             participant, created = Participant.objects.update_or_create(
                 telegram_id=user.id,
                 defaults={
@@ -1142,7 +1120,7 @@ def register_participant_confirm(update, context):
             query.edit_message_text(f"❌ Ошибка регистрации: {str(e)}")
     else:
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             query.edit_message_text("❌ Регистрация отменена")
             context.bot.send_message(
                 chat_id=chat_id,
@@ -1174,7 +1152,7 @@ def my_events_start(update, context):
     """Начало процесса просмотра зарегистрированных мероприятий"""
     user = update.effective_user
     try:
-        participant = Participant.objects.get(telegram_id=user.id)
+        participant = context.get_participant()
     except Participant.DoesNotExist:
         update.message.reply_text(
             "❌ Пожалуйста, начните с команды /start",
@@ -1208,7 +1186,7 @@ def my_events_select_event(update, context):
 
     if query.data == 'cancel':
         try:
-            participant = Participant.objects.get(telegram_id=query.from_user.id)
+            participant = context.get_participant()
             query.edit_message_text(
                 "❌ Действие отменено",
                 parse_mode='HTML'
@@ -1229,8 +1207,8 @@ def my_events_select_event(update, context):
     event_id = int(query.data.split('_')[2])
     try:
         event = Event.objects.get(id=event_id)
-        context.user_data['unregister_event'] = event
-        participant = Participant.objects.get(telegram_id=query.from_user.id)
+        context.user_data['unregister_event_id'] = event.id
+        participant = context.get_participant()
 
         query.edit_message_text(
             f"Подтвердите отписку от мероприятия:\n"
@@ -1257,8 +1235,8 @@ def my_events_confirm_unregister(update, context):
 
     if query.data == 'confirm':
         try:
-            event = context.user_data['unregister_event']
-            participant = Participant.objects.get(telegram_id=user.id)
+            event = Event.objects.get(id=context.user_data['unregister_event_id'])
+            participant = context.get_participant()
             if event in participant.registered_events.all():
                 participant.registered_events.remove(event)
                 query.edit_message_text(
@@ -1283,7 +1261,7 @@ def my_events_confirm_unregister(update, context):
             query.edit_message_text(f"❌ Ошибка отписки: {str(e)}")
     else:
         try:
-            participant = Participant.objects.get(telegram_id=user.id)
+            participant = context.get_participant()
             query.edit_message_text("❌ Отписка отменена")
             context.bot.send_message(
                 chat_id=chat_id,
@@ -1297,52 +1275,9 @@ def my_events_confirm_unregister(update, context):
     return ConversationHandler.END
 
 
-def send_new_event_notification(bot, event):
-    """Отправление подписчикам уведомлений о новых событиях"""
-
-    subscribed_participants = Participant.objects.filter(is_subscribed=True)
-
-    if not subscribed_participants.exists():
-        print("No subscribed participants to notify about new event.")
-        return 0
-
-    sent_count = 0
-    try:
-        notification_text = (
-            f"🎉 <b>Новое мероприятие анонсировано!</b>\n\n"
-            f"📅 <b>{event.title}</b>\n"
-            f"🕒 Дата: {event.date.strftime('%d.%m.%Y')}\n"
-            f"📜 Программа:\n{event.get_program()}\n\n"
-            f"<i>Зарегистрируйтесь или задайте вопросы спикерам через бота!</i>"
-        )
-    except Exception as e:
-        print(f"Error generating notification text: {str(e)}")
-        return 0
-
-    for participant in subscribed_participants:
-        try:
-            bot.send_message(
-                chat_id=participant.telegram_id,
-                text=notification_text,
-                parse_mode='HTML'
-            )
-            sent_count += 1
-        except Exception as e:
-            print(f"Не удалось отправить уведомление участнику с ID {participant.telegram_id}: {str(e)}")
-
-    return sent_count
-
-
 def networking(update, context):
     """Кнопка «Пообщаться» в главном меню"""
-    user = update.message.from_user
-    participant, _ = Participant.objects.get_or_create(
-        telegram_id=user.id,
-        defaults={
-            'telegram_username': user.username,
-            'name': user.first_name or 'Аноним'
-        }
-    )
+    participant = context.get_or_create_participant()
 
     text = (
         "🌟 <b>Знакомства на мероприятии</b> 🌟\n\n"
@@ -1371,7 +1306,7 @@ def start_fill_profile(update, context):
     query = update.callback_query
     query.answer()
 
-    participant = Participant.objects.get(telegram_id=query.from_user.id)
+    participant = context.get_participant()
     if participant.bio:  # Если анкета уже заполнена
         query.edit_message_text(
             "✅ Вы уже заполнили анкету!\n"
@@ -1408,6 +1343,11 @@ def save_bio(update, context):
         name=context.user_data['name'],
         bio=bio
     )
+    # update() не вызывает post_save, поэтому обновляем кэш, поиск и рекомендации вручную
+    participant_cache.invalidate(user.id)
+    participant_id = context.get_participant().pk
+    participant_search.reindex(participant_id)
+    recommender.schedule_update(participant_id)
 
     update.message.reply_text(
         "✅ Анкета сохранена!\n"
@@ -1419,56 +1359,91 @@ def save_bio(update, context):
     return ConversationHandler.END
 
 
+def next_recommendation(participant, rank):
+    """Следующая после rank рекомендованная анкета с заполненным «О себе»"""
+    return ProfileRecommendation.objects.filter(
+        participant=participant,
+        rank__gt=rank,
+        candidate__bio__isnull=False
+    ).select_related('candidate').only(
+        'rank', 'candidate__id', 'candidate__name', 'candidate__bio'
+    ).order_by('rank').first()
+
+
+def next_profile(cursor, participant):
+    """Следующая после cursor анкета (по id), кроме своей и рекомендованных"""
+    return Participant.objects.filter(
+        pk__gt=cursor,
+        bio__isnull=False
+    ).exclude(
+        pk=participant.pk
+    ).exclude(
+        pk__in=ProfileRecommendation.objects.filter(participant=participant).values('candidate_id')
+    ).only('id', 'name', 'bio').order_by('pk').first()
+
+
+def find_next_profile(participant, user_data):
+    """Сначала похожие анкеты по порядку рекомендаций, потом остальные по id.
+
+    В user_data хранятся место последней показанной рекомендации (None - они
+    закончились) и id показанной анкеты. Возвращает (анкета, начали ли сначала).
+    """
+    rank = user_data.get('profile_rank', 0)
+    cursor = user_data.get('profile_cursor', 0)
+    for wrapped in (False, True):
+        if wrapped:
+            rank = cursor = 0
+        if rank is not None:
+            recommendation = next_recommendation(participant, rank)
+            if recommendation is not None:
+                user_data['profile_rank'] = recommendation.rank
+                user_data['profile_cursor'] = recommendation.candidate_id
+                return recommendation.candidate, wrapped
+            # Рекомендации закончились - показываем остальные анкеты с начала
+            rank = None
+            cursor = 0
+        profile = next_profile(cursor, participant)
+        if profile is not None:
+            user_data['profile_rank'] = None
+            user_data['profile_cursor'] = profile.pk
+            return profile, wrapped
+    return None, False
+
+
 def view_profiles(update, context):
     query = update.callback_query
     query.answer()
 
-    participant = Participant.objects.get(telegram_id=query.from_user.id)
-    other_profiles = Participant.objects.exclude(telegram_id=query.from_user.id).filter(bio__isnull=False)
+    participant = context.get_participant()
 
-    if not other_profiles.exists():
+    profile, wrapped = find_next_profile(participant, context.user_data)
+    if profile is None:
         query.edit_message_text("😢 Пока нет анкет для просмотра.")
         return ConversationHandler.END
 
-    # Получаем список всех подходящих профилей
-    available_profiles = list(other_profiles)
-
-    # Если в контексте нет списка просмотренных профилей, создаем его
-    if 'viewed_profiles' not in context.user_data:
-        context.user_data['viewed_profiles'] = []
-
-    # Ищем профиль, который еще не был показан
-    for profile in available_profiles:
-        if profile.telegram_id not in context.user_data['viewed_profiles']:
-            context.user_data['current_profile_id'] = profile.telegram_id
-            context.user_data['viewed_profiles'].append(profile.telegram_id)
-
-            text = (
-                f"👤 <b>{profile.name}</b>\n"
-                f"💼 {profile.bio}\n\n"
-                f"Хотите связаться?"
-            )
-
-            try:
-                query.edit_message_text(
-                    text,
-                    reply_markup=InlineKeyboardMarkup([
-                        [
-                            InlineKeyboardButton("📩 Запросить контакт", callback_data="request_contact"),
-                            InlineKeyboardButton("➡️ Дальше", callback_data="next_profile")
-                        ]
-                    ]),
-                    parse_mode='HTML'
-                )
-                return VIEWING_PROFILE
-            except Exception as e:
-                print(f"Ошибка при редактировании сообщения: {e}")
-                return VIEWING_PROFILE
+    # Если все профили просмотрены - начинаем сначала
+    notice = "🔄 Вы просмотрели все анкеты. Начнем сначала!\n\n" if wrapped else ""
+    text = (
+        f"{notice}"
+        f"👤 <b>{profile.name}</b>\n"
+        f"💼 {profile.bio}\n\n"
+        f"Хотите связаться?"
+    )
 
-    # Если все профили просмотрены
-    context.user_data['viewed_profiles'] = []  # Сбрасываем список просмотренных
-    query.edit_message_text("😢 Вы просмотрели все анкеты. Начнем сначала!")
-    return view_profiles(update, context)  # Рекурсивно запускаем снова
+    try:
+        query.edit_message_text(
+            text,
+            reply_markup=InlineKeyboardMarkup([
+                [
+                    InlineKeyboardButton("📩 Запросить контакт", callback_data="request_contact"),
+                    InlineKeyboardButton("➡️ Дальше", callback_data="next_profile")
+                ]
+            ]),
+            parse_mode='HTML'
+        )
+    except Exception as e:
+        print(f"Ошибка при редактировании сообщения: {e}")
+    return VIEWING_PROFILE
 
 
 def handle_profile_actions(update, context):
@@ -1476,7 +1451,7 @@ def handle_profile_actions(update, context):
     query.answer()
 
     if query.data == "request_contact":
-        profile = Participant.objects.get(telegram_id=context.user_data['current_profile_id'])
+        profile = Participant.objects.only('telegram_username').get(pk=context.user_data['profile_cursor'])
         query.edit_message_text(
             f"✉️ Контакт участника:\n"
             f"@{profile.telegram_username}" if profile.telegram_username else
@@ -1487,15 +1462,70 @@ def handle_profile_actions(update, context):
         return view_profiles(update, context)
 
 
-def back_to_menu(update, context):
-    user = update.message.from_user
-    participant, _ = Participant.objects.get_or_create(
-        telegram_id=user.id,
-        defaults={
-            'telegram_username': user.username,
-            'name': user.first_name or 'Аноним'
-        }
+# Длинные тексты в результатах поиска обрезаются, чтобы ответ уложился в одно сообщение
+SEARCH_SNIPPET_LENGTH = 300
+
+
+def search(update, context):
+    """/search текст: спикеру - его вопросы, организатору - участники"""
+    query = ' '.join(context.args)
+    try:
+        participant = context.get_participant()
+    except Participant.DoesNotExist:
+        participant = None
+
+    if not query:
+        update.message.reply_text("🔎 Напишите, что искать: /search текст")
+        return
+
+    if participant is not None and participant.is_event_manager:
+        profiles = participant_search.search(Participant.objects.all(), query)
+        lines = [
+            f"👤 <b>{escape(profile.name)}</b>"
+            f"{f' (@{profile.telegram_username})' if profile.telegram_username else ''}\n"
+            f"{escape((profile.bio or '')[:SEARCH_SNIPPET_LENGTH])}"
+            for profile in profiles
+        ]
+    elif update.effective_user.username:
+        questions = question_search.search(
+            Question.objects.filter(speaker__telegram_username=update.effective_user.username).select_related('participant'),
+            query
+        )
+        lines = [
+            f"{'✅' if question.is_answered else '❓'} <b>{escape(question.participant.name)}</b>: "
+            f"{escape(question.text[:SEARCH_SNIPPET_LENGTH])}"
+            for question in questions
+        ]
+    else:
+        lines = []
+
+    if not lines:
+        update.message.reply_text("🔎 Ничего не найдено")
+        return
+    update.message.reply_text("🔎 <b>Найдено:</b>\n\n" + "\n\n".join(lines), parse_mode='HTML')
+
+
+def dispatcher_stats(update, context):
+    """Состояние очереди обновлений (только для организаторов)"""
+    try:
+        participant = context.get_participant()
+    except Participant.DoesNotExist:
+        return
+    if not participant.is_event_manager:
+        return
+
+    stats = context.dispatcher.get_stats()
+    update.message.reply_text(
+        f"📊 <b>Очередь обновлений</b>\n\n"
+        f"В очереди: {stats['queue_depth']}\n"
+        f"Занято обработчиков: {stats['busy_workers']} из {stats['workers']}\n"
+        f"Загрузка: {stats['saturation']:.0%}",
+        parse_mode='HTML'
     )
+
+
+def back_to_menu(update, context):
+    participant = context.get_or_create_participant()
     update.message.reply_text(
         "Выберите действие:",
         reply_markup=get_main_keyboard(participant)
@@ -1507,10 +1537,12 @@ def setup_dispatcher(dp):
     dp.add_handler(CommandHandler("start", start))
     dp.add_handler(CommandHandler("help", start))
     dp.add_handler(CommandHandler("cancel", cancel))
+    dp.add_handler(CommandHandler("stats", dispatcher_stats))
+    dp.add_handler(CommandHandler("search", search))
 
     # ConversationHandler: Вопрос спикеру
     ask_speaker_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^❓ Задать вопрос спикеру$'), ask_speaker_start)],
+        entry_points=[MessageHandler(Filters.text(['❓ Задать вопрос спикеру']), ask_speaker_start)],
         states={
             SELECTING_SPEAKER: [
                 CallbackQueryHandler(ask_speaker_select, pattern='^ask_'),
@@ -1530,12 +1562,14 @@ def setup_dispatcher(dp):
             CallbackQueryHandler(ask_speaker_cancel, pattern='^cancel$'),
         ],
         allow_reentry=True,
+        name='ask_speaker',
+        persistent=True,
     )
     dp.add_handler(ask_speaker_conv)
 
     # ConversationHandler: Регистрация участника
     participant_registration_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^👤 Зарегистрироваться участником$'), register_participant_start)],
+        entry_points=[MessageHandler(Filters.text(['👤 Зарегистрироваться участником']), register_participant_start)],
         states={
             SELECTING_EVENT_PARTICIPANT: [
                 CallbackQueryHandler(register_participant_select_event, pattern='^event_'),
@@ -1547,14 +1581,16 @@ def setup_dispatcher(dp):
         },
         fallbacks=[
             CommandHandler('cancel', cancel),
-            MessageHandler(Filters.regex('^🔙 Назад$'), back_to_menu)
+            MessageHandler(Filters.text(['🔙 Назад']), back_to_menu)
         ],
+        name='participant_registration',
+        persistent=True,
     )
     dp.add_handler(participant_registration_conv)
 
     # ConversationHandler: Регистрация спикера
     registration_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^🎤 Зарегистрироваться спикером$'), register_speaker_start)],
+        entry_points=[MessageHandler(Filters.text(['🎤 Зарегистрироваться спикером']), register_speaker_start)],
         states={
             SELECTING_EVENT: [
                 CallbackQueryHandler(register_speaker_select_event, pattern='^event_'),
@@ -1566,14 +1602,16 @@ def setup_dispatcher(dp):
         },
         fallbacks=[
             CommandHandler('cancel', cancel),
-            MessageHandler(Filters.regex('^🔙 Назад$'), back_to_menu)
+            MessageHandler(Filters.text(['🔙 Назад']), back_to_menu)
         ],
+        name='speaker_registration',
+        persistent=True,
     )
     dp.add_handler(registration_conv)
 
     # ConversationHandler: Мои мероприятия
     my_events_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^📋 Мои мероприятия$'), my_events_start)],
+        entry_points=[MessageHandler(Filters.text(['📋 Мои мероприятия']), my_events_start)],
         states={
             SHOW_MY_EVENTS: [
                 CallbackQueryHandler(my_events_select_event, pattern='^my_event_'),
@@ -1584,6 +1622,8 @@ def setup_dispatcher(dp):
             ],
         },
         fallbacks=[CommandHandler('cancel', cancel)],
+        name='my_events',
+        persistent=True,
     )
     dp.add_handler(my_events_conv)
 
@@ -1594,12 +1634,14 @@ def setup_dispatcher(dp):
             CHOOSE_CUSTOM_AMOUNT: [MessageHandler(Filters.text & ~Filters.command, handle_custom_amount)]
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        name='custom_donation',
+        persistent=True,
     )
     dp.add_handler(donate_conv_handler)
 
     # ConversationHandler: Подписка
     subscribe_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^✅ Подписаться на рассылку$'), subscribe_start)],
+        entry_points=[MessageHandler(Filters.text(['✅ Подписаться на рассылку']), subscribe_start)],
         states={
             SUBSCRIBING: [
                 CallbackQueryHandler(subscribe_confirm, pattern='^subscribe_(confirm|cancel)$'),
@@ -1609,12 +1651,14 @@ def setup_dispatcher(dp):
             CommandHandler('cancel', cancel),
             CallbackQueryHandler(subscribe_confirm, pattern='^subscribe_cancel$'),
         ],
+        name='subscribe',
+        persistent=True,
     )
     dp.add_handler(subscribe_conv)
 
     # ConversationHandler: Отписка
     unsubscribe_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^❌ Отписаться от рассылки$'), unsubscribe_start)],
+        entry_points=[MessageHandler(Filters.text(['❌ Отписаться от рассылки']), unsubscribe_start)],
         states={
             UNSUBSCRIBING: [
                 CallbackQueryHandler(unsubscribe_confirm, pattern='^unsubscribe_(confirm|cancel)$'),
@@ -1624,12 +1668,14 @@ def setup_dispatcher(dp):
             CommandHandler('cancel', cancel),
             CallbackQueryHandler(unsubscribe_confirm, pattern='^unsubscribe_cancel$'),
         ],
+        name='unsubscribe',
+        persistent=True,
     )
     dp.add_handler(unsubscribe_conv)
 
     # ConversationHandler: Рассылка
     mailing_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^📢 Сделать рассылку$'), mailing_start)],
+        entry_points=[MessageHandler(Filters.text(['📢 Сделать рассылку']), mailing_start)],
         states={
             MAILING: [
                 MessageHandler(Filters.text & ~Filters.command, mailing_receive_message),
@@ -1642,13 +1688,15 @@ def setup_dispatcher(dp):
             CommandHandler('cancel', cancel),
             CallbackQueryHandler(mailing_confirm, pattern='^mailing_cancel$'),
         ],
+        name='mailing',
+        persistent=True,
     )
     dp.add_handler(mailing_conv)
 
     # ConversationHandler: Нетворкинг
     networking_conv = ConversationHandler(
         entry_points=[
-            MessageHandler(Filters.regex('^🙋 Пообщаться$'), networking),
+            MessageHandler(Filters.text(['🙋 Пообщаться']), networking),
             CallbackQueryHandler(start_fill_profile, pattern='^fill_profile$'),
             CallbackQueryHandler(view_profiles, pattern='^view_profiles$')
         ],
@@ -1659,33 +1707,35 @@ def setup_dispatcher(dp):
         },
         fallbacks=[
             CommandHandler('cancel', cancel),
-            MessageHandler(Filters.regex('^🔙 Назад$'), back_to_menu)
+            MessageHandler(Filters.text(['🔙 Назад']), back_to_menu)
         ],
-        allow_reentry=True
+        allow_reentry=True,
+        name='networking',
+        persistent=True,
     )
     dp.add_handler(networking_conv)
 
-    # Обработчики главного меню
-    dp.add_handler(MessageHandler(Filters.regex('^📅 Мероприятие$'), event_menu))
-    dp.add_handler(MessageHandler(Filters.regex('^📝 Регистрация$'), registration_menu))
-    dp.add_handler(MessageHandler(Filters.regex('^🙋 Пообщаться$'), networking))  # на случай одиночного входа
-    dp.add_handler(MessageHandler(Filters.regex('^🎁 Поддержать$'), donate))
-    dp.add_handler(MessageHandler(Filters.regex('^❓ Мои вопросы$'), show_unanswered_questions))
-    dp.add_handler(MessageHandler(Filters.regex('^📢 Сделать рассылку$'), mailing_start))
-
-    # Подменю "Мероприятие"
-    dp.add_handler(MessageHandler(Filters.regex('^📜 Программа$'), program))
-    dp.add_handler(MessageHandler(Filters.regex('^📋 Мои мероприятия$'), my_events_start))
-    dp.add_handler(MessageHandler(Filters.regex('^❓ Задать вопрос спикеру$'), ask_speaker_start))
-    dp.add_handler(MessageHandler(Filters.regex('^🎤 Кто выступает сейчас\\?$'), current_speaker))
-    dp.add_handler(MessageHandler(Filters.regex('^✅ Подписаться на рассылку$'), subscribe_start))
-    dp.add_handler(MessageHandler(Filters.regex('^❌ Отписаться от рассылки$'), unsubscribe_start))
-    dp.add_handler(MessageHandler(Filters.regex('^🔙 Назад$'), back_to_menu))
-
-    # Подменю "Регистрация"
-    dp.add_handler(MessageHandler(Filters.regex('^👤 Зарегистрироваться участником$'), register_participant_start))
-    dp.add_handler(MessageHandler(Filters.regex('^🎤 Зарегистрироваться спикером$'), register_speaker_start))
-    dp.add_handler(MessageHandler(Filters.regex('^🔙 Назад$'), back_to_menu))
+    # Кнопки меню: один поиск по словарю вместо цепочки regex-обработчиков
+    dp.add_handler(MenuRouter({
+        # Главное меню
+        '📅 Мероприятие': event_menu,
+        '📝 Регистрация': registration_menu,
+        '🙋 Пообщаться': networking,  # на случай одиночного входа
+        '🎁 Поддержать': donate,
+        '❓ Мои вопросы': show_unanswered_questions,
+        '📢 Сделать рассылку': mailing_start,
+        # Подменю "Мероприятие"
+        '📜 Программа': program,
+        '📋 Мои мероприятия': my_events_start,
+        '❓ Задать вопрос спикеру': ask_speaker_start,
+        '🎤 Кто выступает сейчас?': current_speaker,
+        '✅ Подписаться на рассылку': subscribe_start,
+        '❌ Отписаться от рассылки': unsubscribe_start,
+        # Подменю "Регистрация"
+        '👤 Зарегистрироваться участником': register_participant_start,
+        '🎤 Зарегистрироваться спикером': register_speaker_start,
+        '🔙 Назад': back_to_menu,
+    }))
 
     # Обработчики для спикеров
     setup_speaker_handlers(dp)
@@ -1695,16 +1745,78 @@ def setup_dispatcher(dp):
     return dp
 
 
+def schedule_background_jobs(job_queue):
+    """Фоновые задачи процесса, который принимает обновления"""
+    schedule_donation_reconciliation(job_queue)
+    schedule_recommendations_rebuild(job_queue)
+    schedule_broadcast_resume(job_queue)
+    schedule_event_announcements(job_queue)
+    schedule_question_delivery(job_queue)
+
+
+def create_updater(schedule_jobs=True):
+    """Создаёт Updater с зарегистрированными обработчиками.
+
+    schedule_jobs=False - для процессов-обработчиков, где фоновые задачи не нужны.
+    """
+    workers = settings.TG_CHAT_WORKERS
+    dispatcher = ChatOrderedDispatcher(
+        get_bot(),
+        Queue(),
+        job_queue=JobQueue(),
+        use_context=True,
+        context_types=ContextTypes(context=BotContext),
+        persistence=DjangoPersistence(settings.PERSISTENCE_FLUSH_INTERVAL),
+        chat_workers=workers
+    )
+    dispatcher.job_queue.set_dispatcher(dispatcher)
+    updater = Updater(dispatcher=dispatcher, workers=None)
+    setup_dispatcher(dispatcher)
+    if schedule_jobs:
+        schedule_background_jobs(dispatcher.job_queue)
+    return updater
+
+
+def create_ingress_updater():
+    """Updater для приёма обновлений (polling или вебхук).
+
+    При TG_PROCESS_WORKERS > 1 обновления обрабатываются в отдельных
+    процессах (по chat_id), а здесь выполняются только фоновые задачи.
+    """
+    if settings.TG_PROCESS_WORKERS <= 1:
+        return create_updater()
+
+    dispatcher = PartitionedDispatcher(
+        get_bot(),
+        Queue(),
+        job_queue=JobQueue(),
+        use_context=True,
+        processes=settings.TG_PROCESS_WORKERS
+    )
+    dispatcher.job_queue.set_dispatcher(dispatcher)
+    updater = Updater(dispatcher=dispatcher, workers=None)
+    schedule_background_jobs(dispatcher.job_queue)
+    return updater
+
+
 def start_bot():
-    updater = Updater(settings.TG_BOT_TOKEN, use_context=True)
-    dp = updater.dispatcher
+    updater = create_ingress_updater()
 
     updater.bot.set_my_commands([
         BotCommand("start", "Главное меню"),
         BotCommand("help", "Помощь по боту"),
         BotCommand("cancel", "Отмена текущего действия"),
+        BotCommand("search", "Поиск по вопросам и анкетам"),
     ])
 
-    dp = setup_dispatcher(dp)
+    if settings.TG_BOT_MODE == 'webhook':
+        # Обновления принимает meetup.asgi, здесь только регистрируем адрес
+        updater.bot.set_webhook(
+            url=settings.TG_WEBHOOK_URL,
+            secret_token=settings.TG_WEBHOOK_SECRET,
+        )
+        print(f"Вебхук установлен: {settings.TG_WEBHOOK_URL}")
+        return
+
     updater.start_polling()
     updater.idle()
@@ -1,3 +1,648 @@
-from django.test import TestCase
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from telegram import Bot
+
+from events_bot.broadcast import BroadcastSender, create_broadcast
+from events_bot.donations import (
+    PAYMENT_CANCELED,
+    PAYMENT_SUCCEEDED,
+    DonationConfirmer,
+    _Notification,
+    apply_notifications
+)
+from events_bot.models import (
+    BroadcastDelivery,
+    Donation,
+    Event,
+    Participant,
+    ProfileRecommendation,
+    Question,
+    Speaker,
+    TimeSlot
+)
+from events_bot.participants import get_participant, participant_cache
+from events_bot.payments import (
+    CircuitBreaker,
+    PaymentError,
+    PaymentGatewayError,
+    PaymentUnavailable,
+    YooKassaClient
+)
+from events_bot.reconciliation import DonationReconciler
+from events_bot.recommendations import Recommender
+from events_bot.telegram_bot import subscribe_confirm, unsubscribe_confirm
+
+TESTDATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata')
+
+
+def load_notification(name):
+    """Записанное уведомление ЮKassa из testdata/yookassa"""
+    with open(os.path.join(TESTDATA_DIR, 'yookassa', f'{name}.json'), encoding='utf-8') as file:
+        return json.load(file)
+
+
+def create_donations(count):
+    """Неподтверждённые донаты; bulk_create не запускает сигналы участников"""
+    event = Event.objects.create(title="Митап", description="Описание", date=date(2030, 1, 1))
+    participant = Participant.objects.bulk_create([Participant(telegram_id=1, name="Участник")])[0]
+    return Donation.objects.bulk_create([
+        Donation(event=event, participant=participant, amount=300, payment_id=f'payment-{index}')
+        for index in range(count)
+    ])
+
+
+class StubYooKassaHandler(BaseHTTPRequestHandler):
+    """Отвечает на запросы API ЮKassa: создание платежа и его статус"""
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0
+    # Код ответа для всех запросов; 200 - обычная работа
+    status = 200
+    # payment_id -> статус платежа для GET /payments/<id>
+    payments = {}
+    requests = []
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except OSError:
+            # Клиент уже ушёл по таймауту
+            pass
+
+    def _payment(self, payment_id, status):
+        return {
+            'id': payment_id,
+            'status': status,
+            'paid': status == 'succeeded',
+            'amount': {'value': '100.00', 'currency': 'RUB'},
+            'confirmation': {'type': 'redirect', 'confirmation_url': f'https://yoomoney.test/{payment_id}'},
+            'created_at': '2026-01-01T00:00:00.000Z',
+            'test': True,
+            'refundable': False,
+            'metadata': {},
+        }
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.requests.append((self.command, self.path))
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.status != 200:
+            self._reply(self.status, {'type': 'error', 'description': f'Ошибка {self.status}'})
+        elif self.command == 'POST':
+            self._reply(200, self._payment(f'pay-{len(self.requests)}', 'pending'))
+        else:
+            payment_id = self.path.rsplit('/', 1)[-1]
+            if payment_id in self.payments:
+                self._reply(200, self._payment(payment_id, self.payments[payment_id]))
+            else:
+                self._reply(404, {'type': 'error', 'description': 'Платёж не найден'})
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubYooKassaMixin:
+    """Локальная заглушка ЮKassa на свободном порту"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubYooKassaHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.api_url = f'http://127.0.0.1:{cls.server.server_port}/v3'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        StubYooKassaHandler.latency = 0
+        StubYooKassaHandler.status = 200
+        StubYooKassaHandler.payments = {}
+        StubYooKassaHandler.requests = []
+
+    def make_client(self, workers=2, read_timeout=1, threshold=3, cooldown=30):
+        client = YooKassaClient(
+            api_url=self.api_url,
+            shop_id='shop',
+            secret_key='secret',
+            workers=workers,
+            timeout=(1, read_timeout),
+            breaker=CircuitBreaker(threshold, cooldown)
+        )
+        self.addCleanup(client._executor.shutdown)
+        return client
+
+
+PAYMENT_PARAMS = {
+    'amount': {'value': '100.00', 'currency': 'RUB'},
+    'confirmation': {'type': 'redirect', 'return_url': 'https://t.me/meetup_bot'},
+    'capture': True,
+    'description': 'Донат',
+}
+
+
+class YooKassaClientTests(StubYooKassaMixin, SimpleTestCase):
+
+    def test_create_payment(self):
+        payment = self.make_client().create_payment(PAYMENT_PARAMS, 'key-1')
+        self.assertEqual(payment.status, 'pending')
+        self.assertTrue(payment.confirmation.confirmation_url.startswith('https://yoomoney.test/'))
+        self.assertEqual(StubYooKassaHandler.requests, [('POST', '/v3/payments')])
+
+    def test_read_timeout(self):
+        StubYooKassaHandler.latency = 0.5
+        client = self.make_client(read_timeout=0.1)
+        started = time.monotonic()
+        with self.assertRaises(PaymentGatewayError):
+            client.create_payment(PAYMENT_PARAMS, 'key-1')
+        self.assertLess(time.monotonic() - started, 0.4)
+
+    def test_server_errors_open_breaker(self):
+        for status in (503, 429):
+            with self.subTest(status=status):
+                StubYooKassaHandler.status = status
+                StubYooKassaHandler.requests = []
+                client = self.make_client(threshold=3)
+                for _ in range(3):
+                    with self.assertRaises(PaymentGatewayError):
+                        client.create_payment(PAYMENT_PARAMS, 'key-1')
+                with self.assertRaises(PaymentUnavailable):
+                    client.create_payment(PAYMENT_PARAMS, 'key-1')
+                # Открытый предохранитель не пропускает запрос к сервису
+                self.assertEqual(len(StubYooKassaHandler.requests), 3)
+
+    def test_client_error_keeps_breaker_closed(self):
+        StubYooKassaHandler.status = 400
+        client = self.make_client(threshold=2)
+        for _ in range(3):
+            with self.assertRaises(PaymentError) as error:
+                client.create_payment(PAYMENT_PARAMS, 'key-1')
+            self.assertNotIsInstance(error.exception, PaymentGatewayError)
+        self.assertEqual(len(StubYooKassaHandler.requests), 3)
+
+    def test_half_open_trial(self):
+        StubYooKassaHandler.status = 503
+        client = self.make_client(threshold=2, cooldown=0.2)
+        for _ in range(2):
+            with self.assertRaises(PaymentGatewayError):
+                client.create_payment(PAYMENT_PARAMS, 'key-1')
+        time.sleep(0.25)
+
+        # После паузы пропускается один пробный запрос; неудачный снова открывает предохранитель
+        with self.assertRaises(PaymentGatewayError):
+            client.create_payment(PAYMENT_PARAMS, 'key-1')
+        with self.assertRaises(PaymentUnavailable):
+            client.create_payment(PAYMENT_PARAMS, 'key-1')
+        self.assertEqual(len(StubYooKassaHandler.requests), 3)
+
+        time.sleep(0.25)
+        StubYooKassaHandler.status = 200
+        client.create_payment(PAYMENT_PARAMS, 'key-1')
+        client.create_payment(PAYMENT_PARAMS, 'key-2')
+        self.assertEqual(len(StubYooKassaHandler.requests), 5)
+
+    def test_single_trial_while_half_open(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        # Пока пробный запрос не завершён, остальные отклоняются
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+    def test_submit_payment_rejects_when_queue_full(self):
+        StubYooKassaHandler.latency = 0.3
+        client = self.make_client(workers=1)
+        # Очередь пула: workers * 4 платежей
+        futures = [client.submit_payment(PAYMENT_PARAMS, f'key-{index}') for index in range(4)]
+        with self.assertRaises(PaymentUnavailable):
+            client.submit_payment(PAYMENT_PARAMS, 'key-extra')
+        for future in futures:
+            self.assertEqual(future.result(timeout=5).status, 'pending')
+        # Единственный поток пула освобождает место в очереди до того, как возьмёт следующую задачу
+        client._executor.submit(lambda: None).result(timeout=5)
+        client.submit_payment(PAYMENT_PARAMS, 'key-next').result(timeout=5)
+
+
+@override_settings(TG_WEBHOOK_SECRET='webhook-secret')
+class TelegramWebhookTests(SimpleTestCase):
+
+    def setUp(self):
+        self.dispatcher = mock.Mock(bot=Bot('123:ABCDEF'), update_queue=Queue())
+        patcher = mock.patch('events_bot.webhook.get_webhook_dispatcher', return_value=self.dispatcher)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, body, secret='webhook-secret'):
+        headers = {'HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN': secret} if secret is not None else {}
+        return self.client.post(
+            reverse('telegram_webhook'),
+            data=body,
+            content_type='application/json',
+            **headers
+        )
+
+    def test_update_is_dispatched(self):
+        update = {
+            'update_id': 1,
+            'message': {
+                'message_id': 1,
+                'date': 0,
+                'chat': {'id': 42, 'type': 'private'},
+                'from': {'id': 42, 'is_bot': False, 'first_name': 'Анна'},
+                'text': '/start',
+            },
+        }
+        self.assertEqual(self.post(json.dumps(update)).status_code, 200)
+        dispatched = self.dispatcher.update_queue.get_nowait()
+        self.assertEqual((dispatched.update_id, dispatched.effective_chat.id), (1, 42))
+
+    def test_missing_secret_is_forbidden(self):
+        self.assertEqual(self.post('{}', secret=None).status_code, 403)
+
+    def test_wrong_secret_is_forbidden(self):
+        self.assertEqual(self.post('{}', secret='other').status_code, 403)
+
+    def test_non_json_body(self):
+        self.assertEqual(self.post('not json').status_code, 400)
+
+    def test_non_object_body(self):
+        self.assertEqual(self.post('[1]').status_code, 400)
+        self.assertTrue(self.dispatcher.update_queue.empty())
+
+
+class SubscriptionTests(TestCase):
+
+    def setUp(self):
+        self.participant = Participant.objects.create(telegram_id=42, name="Анна")
+        self.addCleanup(participant_cache.clear)
+
+    def confirm(self, handler, data):
+        """Нажатие кнопки подтверждения участником, который уже лежит в кэше"""
+        update = mock.Mock()
+        update.callback_query.data = data
+        update.callback_query.message.chat_id = 42
+        context = mock.Mock()
+        context.get_participant.return_value = get_participant(42)
+        handler(update, context)
+
+    def test_subscribe_keeps_changes_made_after_caching(self):
+        get_participant(42)
+        Participant.objects.filter(pk=self.participant.pk).update(is_event_manager=True)
+
+        self.confirm(subscribe_confirm, 'subscribe_confirm')
+        self.participant.refresh_from_db()
+        self.assertEqual((self.participant.is_subscribed, self.participant.is_event_manager), (True, True))
+        # Следующее обновление видит запись из базы, а не устаревшую копию
+        self.assertTrue(get_participant(42).is_event_manager)
+
+    def test_unsubscribe_keeps_changes_made_after_caching(self):
+        Participant.objects.filter(pk=self.participant.pk).update(is_subscribed=True)
+        get_participant(42)
+        Participant.objects.filter(pk=self.participant.pk).update(is_event_manager=True)
+
+        self.confirm(unsubscribe_confirm, 'unsubscribe_confirm')
+        self.participant.refresh_from_db()
+        self.assertEqual((self.participant.is_subscribed, self.participant.is_event_manager), (False, True))
+
+
+class YooKassaWebhookTests(TransactionTestCase):
+    """Записанные уведомления через /yookassa-webhook/ (записывает их фоновый поток)"""
+
+    YOOKASSA_ADDRESS = '185.71.76.10'
+
+    def setUp(self):
+        self.succeeded = load_notification('payment.succeeded')
+        self.canceled = load_notification('payment.canceled')
+        self.donation = create_donations(1)[0]
+        self.donation.payment_id = self.succeeded['object']['id']
+        self.donation.save()
+
+    def post(self, payload, address=YOOKASSA_ADDRESS):
+        return self.client.post(
+            reverse('yookassa_webhook'),
+            data=json.dumps(payload),
+            content_type='application/json',
+            REMOTE_ADDR=address
+        )
+
+    def assertDonationState(self, is_confirmed, is_canceled):
+        self.donation.refresh_from_db()
+        self.assertEqual((self.donation.is_confirmed, self.donation.is_canceled), (is_confirmed, is_canceled))
+
+    def test_succeeded_confirms_donation(self):
+        self.assertEqual(self.post(self.succeeded).status_code, 200)
+        self.assertDonationState(is_confirmed=True, is_canceled=False)
+
+    def test_duplicate_succeeded_changes_nothing(self):
+        self.assertEqual(self.post(self.succeeded).status_code, 200)
+        self.assertEqual(self.post(self.succeeded).status_code, 200)
+        self.assertDonationState(is_confirmed=True, is_canceled=False)
+        self.assertEqual(Donation.objects.filter(payment_id=self.donation.payment_id).count(), 1)
+
+    def test_late_cancel_after_success_is_ignored(self):
+        self.post(self.succeeded)
+        self.assertEqual(self.post(self.canceled).status_code, 200)
+        self.assertDonationState(is_confirmed=True, is_canceled=False)
+
+    def test_cancel_marks_pending_donation(self):
+        self.assertEqual(self.post(self.canceled).status_code, 200)
+        self.assertDonationState(is_confirmed=False, is_canceled=True)
+
+    def test_foreign_address_is_forbidden(self):
+        self.assertEqual(self.post(self.succeeded, address='203.0.113.7').status_code, 403)
+        self.assertDonationState(is_confirmed=False, is_canceled=False)
+
+    def test_other_events_are_acknowledged(self):
+        self.assertEqual(self.post(load_notification('refund.succeeded')).status_code, 200)
+        self.assertDonationState(is_confirmed=False, is_canceled=False)
+
+    def test_malformed_body(self):
+        response = self.client.post(
+            reverse('yookassa_webhook'),
+            data='{"event": "payment.succeeded"}',
+            content_type='application/json',
+            REMOTE_ADDR=self.YOOKASSA_ADDRESS
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ApplyNotificationsTests(TestCase):
+
+    def notifications(self, name, payment_ids):
+        """Записанное уведомление, повторённое для каждого платежа"""
+        event = load_notification(name)['event']
+        return [_Notification(payment_id, event) for payment_id in payment_ids]
+
+    def test_burst_is_applied_in_two_updates(self):
+        donations = create_donations(300)
+        paid = [donation.payment_id for donation in donations[:200]]
+        expired = [donation.payment_id for donation in donations[200:]]
+        burst = (
+            self.notifications('payment.succeeded', paid)
+            + self.notifications('payment.canceled', expired)
+            # Повторы и запоздавшие отмены уже оплаченных
+            + self.notifications('payment.succeeded', paid[:50])
+            + self.notifications('payment.canceled', paid[:50])
+        )
+        self.assertEqual({n.event for n in burst}, {PAYMENT_SUCCEEDED, PAYMENT_CANCELED})
+
+        with CaptureQueriesContext(connection) as queries:
+            apply_notifications(burst)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+
+        self.assertEqual(Donation.objects.filter(is_confirmed=True, is_canceled=False).count(), 200)
+        self.assertEqual(Donation.objects.filter(is_confirmed=False, is_canceled=True).count(), 100)
+
+        # Повторное применение той же пачки ничего не меняет
+        apply_notifications(burst)
+        self.assertEqual(Donation.objects.filter(is_confirmed=True, is_canceled=False).count(), 200)
+        self.assertEqual(Donation.objects.filter(is_confirmed=False, is_canceled=True).count(), 100)
+
+
+class DonationConfirmerTests(SimpleTestCase):
+
+    def test_reconnects_after_failed_batch(self):
+        confirmer = DonationConfirmer(max_batch=10, max_delay=0)
+        with mock.patch('events_bot.donations.apply_notifications',
+                        side_effect=[OperationalError("server closed the connection"), None]), \
+                mock.patch('events_bot.donations.connection') as db_connection, \
+                mock.patch('events_bot.donations.print', create=True):
+            self.assertFalse(confirmer.submit('payment-1', PAYMENT_SUCCEEDED, timeout=5))
+            db_connection.close.assert_called_once_with()
+            # Следующая пачка идёт через новое соединение и записывается
+            self.assertTrue(confirmer.submit('payment-1', PAYMENT_SUCCEEDED, timeout=5))
+            db_connection.close_if_unusable_or_obsolete.assert_called_once_with()
+
+
+class DonationReconcilerTests(StubYooKassaMixin, TestCase):
+
+    def make_reconciler(self, batch_size=100):
+        # Порог предохранителя выше числа запросов: проверяем саму сверку
+        return DonationReconciler(
+            self.make_client(threshold=1000),
+            batch_size=batch_size,
+            interval=300,
+            max_backoff=1000
+        )
+
+    def test_one_bulk_update_per_chunk(self):
+        donations = create_donations(250)
+        for index, donation in enumerate(donations):
+            StubYooKassaHandler.payments[donation.payment_id] = (
+                'succeeded' if index % 3 == 0 else 'canceled' if index % 3 == 1 else 'pending'
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.make_reconciler(batch_size=100).run()
+        self.assertEqual(result, (84, 83, 0))
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(len(StubYooKassaHandler.requests), 250)
+
+        self.assertEqual(Donation.objects.filter(is_confirmed=True).count(), 84)
+        self.assertEqual(Donation.objects.filter(is_canceled=True).count(), 83)
+        self.assertEqual(Donation.objects.filter(is_confirmed=False, is_canceled=False).count(), 83)
+
+    def test_backoff_on_gateway_errors(self):
+        donations = create_donations(5)
+        reconciler = self.make_reconciler()
+        StubYooKassaHandler.status = 503
+        delays = []
+        for _ in range(4):
+            confirmed, canceled, errors = reconciler.run()
+            self.assertGreater(errors, 0)
+            delays.append(reconciler.delay)
+        self.assertEqual(delays, [600, 1000, 1000, 1000])
+        self.assertFalse(Donation.objects.filter(is_confirmed=True).exists())
+
+        StubYooKassaHandler.status = 200
+        StubYooKassaHandler.payments = {donation.payment_id: 'succeeded' for donation in donations}
+        self.assertEqual(reconciler.run(), (5, 0, 0))
+        self.assertEqual(reconciler.delay, 300)
+
+    def test_single_payment_client_error_is_skipped(self):
+        donations = create_donations(3)
+        # Первого платежа ЮKassa не знает - 404
+        StubYooKassaHandler.payments = {donation.payment_id: 'succeeded' for donation in donations[1:]}
+        reconciler = self.make_reconciler()
+        with mock.patch('events_bot.reconciliation.print', create=True) as log:
+            self.assertEqual(reconciler.run(), (2, 0, 0))
+        log.assert_called_once()
+        self.assertEqual(reconciler.delay, 300)
+        self.assertEqual(
+            list(Donation.objects.filter(is_confirmed=True).values_list('pk', flat=True).order_by('pk')),
+            [donation.pk for donation in donations[1:]]
+        )
+
+
+class RecommenderTests(TestCase):
+
+    def setUp(self):
+        Participant.objects.bulk_create([
+            Participant(telegram_id=1, name="Анна", bio="Python разработчик, люблю Django"),
+            Participant(telegram_id=2, name="Борис", bio="Django и Python в продакшене"),
+            Participant(telegram_id=3, name="Вера", bio="Дизайнер интерфейсов, Figma"),
+            Participant(telegram_id=4, name="Глеб", bio="Figma, интерфейсы и немного Python"),
+        ])
+        self.pks = dict(Participant.objects.values_list('telegram_id', 'pk'))
+
+    def candidates(self, telegram_id):
+        return list(ProfileRecommendation.objects.filter(
+            participant_id=self.pks[telegram_id]
+        ).values_list('candidate_id', flat=True))
+
+    @mock.patch('events_bot.recommendations.REBUILD_CHUNK_SIZE', 2)
+    def test_rebuild_in_chunks(self):
+        recommender = Recommender(limit=2)
+        self.assertEqual(recommender.rebuild(), 4)
+        self.assertEqual(self.candidates(1)[0], self.pks[2])
+        self.assertEqual(self.candidates(3)[0], self.pks[4])
+
+        # Списки не изменились - пересборка ничего не пишет
+        with CaptureQueriesContext(connection) as queries:
+            recommender.rebuild()
+        writes = [query['sql'] for query in queries if query['sql'].startswith(('INSERT', 'DELETE'))]
+        self.assertEqual(writes, [])
+
+    def test_rebuild_drops_removed_profiles(self):
+        recommender = Recommender(limit=2)
+        recommender.rebuild()
+        Participant.objects.filter(telegram_id=1).update(bio=None)
+
+        recommender.rebuild()
+        self.assertEqual(self.candidates(1), [])
+        self.assertNotIn(self.pks[1], self.candidates(2))
+
+
+class AdminChangelistQueriesTests(TestCase):
+    """Число запросов списка в админке не зависит от числа строк"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def populate(self, count, offset=0):
+        """count строк каждой модели; bulk_create не запускает сигналы"""
+        events = Event.objects.bulk_create([
+            Event(title=f"Митап {index}", description="Описание", date=date(2030, 1, 1 + index % 28))
+            for index in range(offset, offset + count)
+        ])
+        speakers = Speaker.objects.bulk_create([
+            Speaker(name=f"Спикер {index}", telegram_username=f'speaker_{index}', telegram_id=1000 + index)
+            for index in range(offset, offset + count)
+        ])
+        participants = Participant.objects.bulk_create([
+            Participant(telegram_id=2000 + index, name=f"Участник {index}")
+            for index in range(offset, offset + count)
+        ])
+        Speaker.events.through.objects.bulk_create([
+            Speaker.events.through(speaker=speaker, event=event) for speaker, event in zip(speakers, events)
+        ])
+        start = timezone.make_aware(datetime(2030, 1, 1, 10))
+        TimeSlot.objects.bulk_create([
+            TimeSlot(event=event, speaker=speaker, start_time=start, end_time=start + timedelta(hours=1),
+                     title=f"Доклад {index}")
+            for index, (event, speaker) in enumerate(zip(events, speakers), start=offset)
+        ])
+        Question.objects.bulk_create([
+            Question(event=event, speaker=speaker, participant=participant, text=f"Вопрос {index}")
+            for index, (event, speaker, participant) in enumerate(zip(events, speakers, participants), start=offset)
+        ])
+        Donation.objects.bulk_create([
+            Donation(event=event, participant=participant, amount=300, payment_id=f'payment-{index}')
+            for index, (event, participant) in enumerate(zip(events, participants), start=offset)
+        ])
+
+    def assert_changelist_queries(self, model, expected):
+        url = reverse(f'admin:events_bot_{model}_changelist')
+        self.populate(1)
+        for count in (1, 20):
+            if count > 1:
+                self.populate(count - 1, offset=1)
+            with self.subTest(rows=count), self.assertNumQueries(expected):
+                response = self.client.get(url)
+                self.assertEqual(response.context['cl'].result_count, count)
+
+    def test_event_changelist(self):
+        self.assert_changelist_queries('event', 8)
+
+    def test_speaker_changelist(self):
+        self.assert_changelist_queries('speaker', 5)
+
+    def test_question_changelist(self):
+        self.assert_changelist_queries('question', 8)
+
+    def test_donation_changelist(self):
+        self.assert_changelist_queries('donation', 8)
+
+    def test_timeslot_changelist(self):
+        self.assert_changelist_queries('timeslot', 8)
+
+
+class BroadcastSenderTests(TransactionTestCase):
+
+    def setUp(self):
+        Participant.objects.bulk_create([
+            Participant(telegram_id=telegram_id, name=f"Участник {telegram_id}", is_subscribed=True)
+            for telegram_id in (1, 2, 3)
+        ])
+
+    def send(self, send_with_retries):
+        broadcast = create_broadcast("Анонс", Participant.objects.filter(is_subscribed=True))
+        with mock.patch('events_bot.broadcast.send_with_retries', side_effect=send_with_retries), \
+                mock.patch('events_bot.broadcast.print', create=True) as printed:
+            sender = BroadcastSender(mock.Mock(), broadcast).start()
+            self.assertTrue(sender.finished.wait(10))
+        broadcast.refresh_from_db()
+        return broadcast, printed
+
+    def test_finished_when_all_delivered(self):
+        broadcast, _ = self.send(lambda bot, chat_id, text, **kwargs: '')
+        self.assertTrue(broadcast.is_finished)
+        self.assertEqual(broadcast.get_status_counts()[BroadcastDelivery.Status.SENT], 3)
+
+    def test_failed_delivery_leaves_broadcast_resumable(self):
+        def send_with_retries(bot, chat_id, text, **kwargs):
+            if chat_id == 2:
+                raise RuntimeError("database is locked")
+            return ''
+
+        broadcast, printed = self.send(send_with_retries)
+        self.assertFalse(broadcast.is_finished)
+        self.assertIsNone(broadcast.lease_expires_at)
+        self.assertEqual(broadcast.get_status_counts()[BroadcastDelivery.Status.PENDING], 1)
+        self.assertTrue(any("database is locked" in call.args[0] for call in printed.call_args_list))
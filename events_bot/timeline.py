@@ -0,0 +1,40 @@
+from bisect import bisect_right
+
+
+class Timeline:
+    """Слоты мероприятия, отсортированные по началу, для поиска по времени через bisect"""
+
+    def __init__(self, slots):
+        self.slots = sorted(slots, key=lambda slot: slot.start_time)
+        self._starts = [slot.start_time for slot in self.slots]
+        # Самое позднее окончание среди слотов до i-го включительно:
+        # если оно раньше now, ни один из этих слотов уже не идёт
+        self._max_ends = []
+        for slot in self.slots:
+            latest = self._max_ends[-1] if self._max_ends else slot.end_time
+            self._max_ends.append(max(latest, slot.end_time))
+        # Продлённое выступление считается текущим вне зависимости от расписания
+        self._extended = next((slot for slot in self.slots if slot.is_extended), None)
+
+    def current(self, now):
+        """Идущее сейчас выступление (при наложении слотов - начавшееся последним)"""
+        if self._extended is not None:
+            return self._extended
+
+        index = bisect_right(self._starts, now) - 1
+        while index >= 0 and self._max_ends[index] >= now:
+            slot = self.slots[index]
+            if slot.end_time >= now:
+                return slot
+            index -= 1
+        return None
+
+    def next(self, now):
+        """Ближайшее ещё не начавшееся выступление"""
+        index = bisect_right(self._starts, now)
+        return self.slots[index] if index < len(self.slots) else None
+
+    def until_next(self, now):
+        """Сколько осталось до следующего выступления (timedelta) или None"""
+        slot = self.next(now)
+        return slot.start_time - now if slot else None
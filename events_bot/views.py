@@ -1,28 +1,15 @@
-from django.conf import settings
 from django.utils import timezone
-from django.db import transaction, models
+from django.db import transaction
 from .models import Event, Speaker, TimeSlot, Participant, Question
-from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
-from environs import Env
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
-
-env = Env()
-env.read_env()
-BOT_TOKEN = settings.TG_BOT_TOKEN
+from .questions import enqueue_question
 
 
 def get_program():
-    today = timezone.now().date()
-    today_events = Event.objects.filter(date=today).prefetch_related(
-        'speakers', 'time_slots').order_by('time_slots__start_time')
+    today = timezone.localdate()
     program = []
-    for event in today_events:
-        for timeslot in event.time_slots.all():
-            speaker = timeslot.speaker.name
-            program.append(
-                f"{timeslot.start_time.strftime('%H:%M')} - {timeslot.end_time.strftime('%H:%M')}: "
-                f"{timeslot.title} ({', '.join(speaker)})"
-            )
+    for event in Event.objects.filter(date=today):
+        program.extend(event.get_program_lines())
     return program
 
 
@@ -69,42 +56,38 @@ def get_chat_id_by_username(username):
 
 
 def send_question(speaker_username, participant_id, participant_name, text):
-    bot = Bot(token=BOT_TOKEN)
+    """Сохраняет вопрос; спикеру он уходит в фоне после фиксации записи.
 
+    Чтения идут вне транзакции, а вопрос сохраняется одним INSERT: в SQLite
+    транзакция, начатая чтением, не может дождаться блокировки на запись
+    и сразу падает с "database is locked", когда вопросы задают одновременно.
+    """
     try:
-        with transaction.atomic():
-            # Ищем спикера ТОЛЬКО по telegram_username
-            speaker = Speaker.objects.get(telegram_username=speaker_username)
-
-            # Проверяем, что спикер привязан к активному мероприятию
-            if not speaker.events.filter(is_active=True).exists():
-                raise Exception("Спикер не привязан к активному мероприятию")
-
-            participant, _ = Participant.objects.get_or_create(
-                telegram_id=participant_id,
-                defaults={'name': participant_name}
-            )
-            event = speaker.events.filter(is_active=True).first()
-
-            # Создаем вопрос в БД
-            question = Question.objects.create(
-                event=event,
-                speaker=speaker,
-                participant=participant,
-                text=text
-            )
-
-            reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("✅ Ответить", callback_data=f'answer_{question.id}')]
-            ])
-
-            bot.send_message(
-                chat_id=speaker.telegram_id,
-                text=f"❓ Новый вопрос от {participant_name}:\n\n{text}",
-                reply_markup=reply_markup
-            )
-
-            return True
+        # Ищем спикера ТОЛЬКО по telegram_username
+        speaker = Speaker.objects.get(telegram_username=speaker_username)
+
+        # Проверяем, что спикер привязан к активному мероприятию
+        event = speaker.events.filter(is_active=True).first()
+        if event is None:
+            raise Exception("Спикер не привязан к активному мероприятию")
+
+        participant, _ = Participant.objects.get_or_create(
+            telegram_id=participant_id,
+            defaults={'name': participant_name}
+        )
+
+        # Создаем вопрос в БД
+        question = Question.objects.create(
+            event=event,
+            speaker=speaker,
+            participant=participant,
+            text=text
+        )
+
+        # Отправка в Telegram не держит блокировку БД и повторяется при сбоях
+        transaction.on_commit(lambda: enqueue_question(question.id))
+
+        return True
 
     except Speaker.DoesNotExist:
         raise Exception(f"Спикер @{speaker_username} не найден")
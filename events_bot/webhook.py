@@ -0,0 +1,102 @@
+import ipaddress
+import json
+import threading
+
+from django.conf import settings
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseServerError
+)
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from telegram import Update
+
+from events_bot.donations import PAYMENT_CANCELED, PAYMENT_SUCCEEDED, donation_confirmer
+from events_bot.telegram_bot import create_ingress_updater
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+YOOKASSA_NETWORKS = [ipaddress.ip_network(net) for net in settings.YOOKASSA_WEBHOOK_IPS]
+# Сколько запрос ждёт записи уведомления; при превышении ЮKassa повторит его позже
+YOOKASSA_WEBHOOK_TIMEOUT = 10
+
+_updater = None
+_updater_lock = threading.Lock()
+
+
+def get_webhook_dispatcher():
+    """Диспетчер, который обрабатывает обновления из вебхука (один на процесс)"""
+    global _updater
+    with _updater_lock:
+        if _updater is None:
+            updater = create_ingress_updater()
+            threading.Thread(
+                target=updater.dispatcher.start,
+                name='dispatcher',
+                daemon=True
+            ).start()
+            # Задачи JobQueue в том числе продолжают брошенные рассылки и досылают вопросы
+            updater.job_queue.start()
+            _updater = updater
+    return _updater.dispatcher
+
+
+@csrf_exempt
+@require_POST
+def telegram_webhook(request):
+    """Принимает обновление от Telegram и ставит его в очередь диспетчера"""
+    secret = settings.TG_WEBHOOK_SECRET
+    if not secret or not constant_time_compare(request.headers.get(SECRET_HEADER, ''), secret):
+        return HttpResponseForbidden()
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest()
+    # Update.de_json ожидает объект; на другом теле ответ 500 заставил бы Telegram повторять его
+    if not isinstance(data, dict):
+        return HttpResponseBadRequest()
+
+    dispatcher = get_webhook_dispatcher()
+    update = Update.de_json(data, dispatcher.bot)
+    if update is None:
+        return HttpResponseBadRequest()
+
+    dispatcher.update_queue.put(update)
+    return HttpResponse()
+
+
+def is_yookassa_address(address):
+    if not YOOKASSA_NETWORKS:
+        return True
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in YOOKASSA_NETWORKS)
+
+
+@csrf_exempt
+@require_POST
+def yookassa_webhook(request):
+    """Принимает уведомление ЮKassa о платеже и подтверждает или отменяет донат"""
+    if not is_yookassa_address(request.META.get('REMOTE_ADDR', '')):
+        return HttpResponseForbidden()
+
+    try:
+        data = json.loads(request.body)
+        event = data['event']
+        payment_id = data['object']['id']
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest()
+
+    if event not in (PAYMENT_SUCCEEDED, PAYMENT_CANCELED):
+        # Остальные события (возвраты и т.п.) донатов не касаются
+        return HttpResponse()
+
+    if not donation_confirmer.submit(payment_id, event, timeout=YOOKASSA_WEBHOOK_TIMEOUT):
+        return HttpResponseServerError()
+    return HttpResponse()
@@ -0,0 +1,168 @@
+import multiprocessing
+import queue as queue_module
+
+from django.conf import settings
+from telegram import Update
+from telegram.ext import Dispatcher
+
+# spawn, а не fork: в процессе приёма уже работают потоки и открыты соединения с базой
+_context = multiprocessing.get_context('spawn')
+
+
+def partition(update, processes):
+    """Номер процесса для обновления: все обновления одного чата идут в один процесс"""
+    chat = update.effective_chat
+    return chat.id % processes if chat else 0
+
+
+def _run_worker(queue, ready):
+    """Процесс-обработчик: свой диспетчер с полным набором обработчиков"""
+    import django
+    django.setup()
+    from events_bot.telegram_bot import create_updater
+
+    updater = create_updater(schedule_jobs=False)
+    dispatcher = updater.dispatcher
+    # Очередь update_queue здесь не нужна: обновления сразу раскладываются по потокам чатов
+    dispatcher.start_chat_workers()
+    ready.set()
+
+    while True:
+        data = queue.get()
+        if data is None:
+            break
+        update = Update.de_json(data, dispatcher.bot)
+        if update is not None:
+            dispatcher.process_update(update)
+
+    # Дорабатываем уже принятые обновления и сохраняем состояние диалогов
+    dispatcher.stop()
+    if dispatcher.persistence:
+        dispatcher.persistence.flush()
+
+
+class WorkerPool:
+    """Процессы-обработчики обновлений, разделённые по chat_id.
+
+    Обновления одного чата всегда попадают в один процесс, поэтому порядок
+    внутри чата и состояние его диалогов (DjangoPersistence) остаются
+    локальными для процесса. Кэш участников у каждого процесса свой
+    и устаревает не дольше, чем на PARTICIPANT_CACHE_TTL; программа
+    хранится в снимке активных мероприятий и живёт не дольше SNAPSHOT_TTL.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self._queues = []
+        self._workers = []
+        self._ready = []
+
+    @property
+    def running(self):
+        return bool(self._workers)
+
+    def _spawn(self, index):
+        queue = _context.Queue()
+        ready = _context.Event()
+        worker = _context.Process(
+            target=_run_worker,
+            args=(queue, ready),
+            name=f'update_worker_{index}',
+            daemon=True
+        )
+        worker.start()
+        return queue, worker, ready
+
+    def start(self):
+        for index in range(self.processes):
+            queue, worker, ready = self._spawn(index)
+            self._queues.append(queue)
+            self._workers.append(worker)
+            self._ready.append(ready)
+        for worker, ready in zip(self._workers, self._ready):
+            while not ready.wait(1):
+                if not worker.is_alive():
+                    self.stop()
+                    raise RuntimeError(
+                        f"Процесс {worker.name} завершился при запуске с кодом {worker.exitcode}"
+                    )
+
+    def _restart(self, index):
+        """Заменяет упавший процесс; непрочитанные им обновления переходят новому"""
+        worker = self._workers[index]
+        if not self._ready[index].is_set():
+            # Процесс упал, не успев запуститься: перезапуск упадёт так же
+            raise RuntimeError(f"Процесс {worker.name} не запустился, код выхода {worker.exitcode}")
+        print(
+            f"ВНИМАНИЕ: процесс {worker.name} завершился с кодом {worker.exitcode}; "
+            f"обновления, которые он обрабатывал, потеряны. Запускаем его заново"
+        )
+        old_queue = self._queues[index]
+        queue, worker, ready = self._spawn(index)
+        drained = 0
+        while True:
+            try:
+                data = old_queue.get(timeout=0.1)
+            except queue_module.Empty:
+                break
+            if data is not None:
+                queue.put(data)
+                drained += 1
+        if drained:
+            print(f"Новому процессу {worker.name} переданы {drained} необработанных обновлений")
+        self._queues[index] = queue
+        self._workers[index] = worker
+        self._ready[index] = ready
+
+    def put(self, update):
+        index = partition(update, self.processes)
+        if not self._workers[index].is_alive():
+            self._restart(index)
+        self._queues[index].put(update.to_dict())
+
+    def stop(self):
+        """Дожидается обработки всех переданных обновлений и завершает процессы.
+
+        Процесс, не успевший за TG_PROCESS_STOP_TIMEOUT секунд, завершается принудительно.
+        """
+        for queue, worker in zip(self._queues, self._workers):
+            if worker.is_alive():
+                queue.put(None)
+        for worker in self._workers:
+            worker.join(settings.TG_PROCESS_STOP_TIMEOUT)
+            if worker.is_alive():
+                print(f"ВНИМАНИЕ: процесс {worker.name} не завершился вовремя и будет остановлен")
+                worker.terminate()
+                worker.join(5)
+                if worker.is_alive():
+                    worker.kill()
+                    worker.join()
+        self._queues = []
+        self._workers = []
+        self._ready = []
+
+
+class PartitionedDispatcher(Dispatcher):
+    """Диспетчер процесса приёма: сам обновления не обрабатывает,
+    а передаёт их в WorkerPool. Задачи JobQueue выполняются здесь.
+    """
+
+    def __init__(self, *args, processes, **kwargs):
+        super().__init__(*args, workers=1, **kwargs)
+        self.pool = WorkerPool(processes)
+
+    def start(self, ready=None):
+        if not self.pool.running:
+            self.pool.start()
+        super().start(ready)
+
+    def stop(self):
+        super().stop()
+        self.pool.stop()
+
+    def process_update(self, update):
+        if isinstance(update, Update):
+            self.pool.put(update)
+        else:
+            # Ошибки из update_queue обрабатываем на месте
+            super().process_update(update)
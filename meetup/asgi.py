@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meetup.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings
+
+if settings.TG_BOT_MODE == 'webhook':
+    # Поднимаем диспетчер заранее, чтобы первое обновление не ждало инициализации
+    from events_bot.webhook import get_webhook_dispatcher
+    get_webhook_dispatcher()
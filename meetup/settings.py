@@ -16,7 +16,7 @@ TG_BOT_TOKEN =env.str('TG_BOT_TOKEN')
 
 
 DEBUG = True
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', [])
 
 
 INSTALLED_APPS = [
@@ -60,12 +60,47 @@ TEMPLATES = [
 WSGI_APPLICATION = 'meetup.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# База данных: 'sqlite' (по умолчанию) или 'postgresql'
+DB_ENGINE = env.str('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env.str('DB_NAME', 'meetup'),
+            'USER': env.str('DB_USER', 'meetup'),
+            'PASSWORD': env.str('DB_PASSWORD', ''),
+            'HOST': env.str('DB_HOST', 'localhost'),
+            'PORT': env.str('DB_PORT', '5432'),
+            # Соединение живёт между запросами и проверяется перед использованием.
+            # Сами по себе эти настройки действуют только на HTTP-запросы (сигналы
+            # request_started/finished); потоки бота вызывают close_old_connections
+            # вокруг каждого обновления (ChatOrderedDispatcher)
+            'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', 600),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': env.str('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+            # Файл базы открывается один раз на поток: close_old_connections
+            # в потоках бота не переоткрывает его на каждое обновление
+            'CONN_MAX_AGE': None,
+            'OPTIONS': {
+                # Сколько секунд ждать освобождения базы другим процессом
+                'timeout': env.int('SQLITE_BUSY_TIMEOUT', 20),
+            },
+        }
+    }
+
+# Режим журнала и синхронизации SQLite (задаются при открытии соединения):
+# WAL не блокирует чтение во время записи, NORMAL не ждёт fsync на каждой транзакции
+SQLITE_JOURNAL_MODE = env.str('SQLITE_JOURNAL_MODE', 'wal')
+SQLITE_SYNCHRONOUS = env.str('SQLITE_SYNCHRONOUS', 'normal')
+# Объём файла базы, который SQLite читает через mmap (байт, только в режиме WAL)
+SQLITE_MMAP_SIZE = env.int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
 
 
 
@@ -103,6 +138,81 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 YOOKASSA_SHOP_ID = env.str('YOOKASSA_SHOP_ID', '')
 YOOKASSA_SECRET_KEY = env.str('YOOKASSA_SECRET_KEY', '')
-#WEBHOOK_URL = 'https://домен/yookassa-webhook/'
+YOOKASSA_API_URL = env.str('YOOKASSA_API_URL', 'https://api.yookassa.ru/v3')
+# Платежи создаются в отдельном пуле потоков с таймаутами (в секундах);
+# после BREAKER_THRESHOLD сбоев подряд запросы не отправляются BREAKER_COOLDOWN секунд
+YOOKASSA_WORKERS = env.int('YOOKASSA_WORKERS', 4)
+YOOKASSA_CONNECT_TIMEOUT = env.float('YOOKASSA_CONNECT_TIMEOUT', 3)
+YOOKASSA_READ_TIMEOUT = env.float('YOOKASSA_READ_TIMEOUT', 10)
+YOOKASSA_BREAKER_THRESHOLD = env.int('YOOKASSA_BREAKER_THRESHOLD', 5)
+YOOKASSA_BREAKER_COOLDOWN = env.int('YOOKASSA_BREAKER_COOLDOWN', 30)
+# Уведомления о платежах: https://домен/yookassa-webhook/
+# Принимаются только с адресов ЮKassa (пустой список отключает проверку)
+YOOKASSA_WEBHOOK_IPS = env.list('YOOKASSA_WEBHOOK_IPS', [
+    '185.71.76.0/27',
+    '185.71.77.0/27',
+    '77.75.153.0/25',
+    '77.75.156.11',
+    '77.75.156.35',
+    '77.75.154.128/25',
+    '2a02:5180::/32',
+])
+# Уведомления записываются пачками: до BATCH_SIZE штук, собранных за BATCH_DELAY секунд
+YOOKASSA_WEBHOOK_BATCH_SIZE = env.int('YOOKASSA_WEBHOOK_BATCH_SIZE', 500)
+YOOKASSA_WEBHOOK_BATCH_DELAY = env.float('YOOKASSA_WEBHOOK_BATCH_DELAY', 0.2)
+# Сверка неподтверждённых донатов со статусами в ЮKassa (интервалы в секундах)
+DONATION_RECONCILE_INTERVAL = env.int('DONATION_RECONCILE_INTERVAL', 300)
+DONATION_RECONCILE_BATCH_SIZE = env.int('DONATION_RECONCILE_BATCH_SIZE', 100)
+DONATION_RECONCILE_MAX_BACKOFF = env.int('DONATION_RECONCILE_MAX_BACKOFF', 3600)
 
 TG_BOT_USERNAME =env.str('TG_BOT_USERNAME', '')
+
+# Режим получения обновлений: 'polling' или 'webhook'
+TG_BOT_MODE = env.str('TG_BOT_MODE', 'polling')
+TG_WEBHOOK_URL = env.str('TG_WEBHOOK_URL', '')
+TG_WEBHOOK_SECRET = env.str('TG_WEBHOOK_SECRET', '')
+
+# Адрес Bot API (можно указать свой сервер telegram-bot-api)
+TG_API_URL = env.str('TG_API_URL', 'https://api.telegram.org/bot')
+
+# Количество потоков, параллельно обрабатывающих обновления разных чатов
+TG_CHAT_WORKERS = env.int('TG_CHAT_WORKERS', 8)
+
+# Процессы-обработчики обновлений (обновления делятся между ними по chat_id);
+# 1 - всё обрабатывается в одном процессе
+TG_PROCESS_WORKERS = env.int('TG_PROCESS_WORKERS', 1)
+# Сколько секунд при остановке ждать, пока процесс-обработчик доработает очередь
+TG_PROCESS_STOP_TIMEOUT = env.int('TG_PROCESS_STOP_TIMEOUT', 30)
+
+# Кэш участников в памяти процесса бота
+PARTICIPANT_CACHE_SIZE = env.int('PARTICIPANT_CACHE_SIZE', 10000)
+PARTICIPANT_CACHE_TTL = env.int('PARTICIPANT_CACHE_TTL', 60)
+
+# Как долго бот держит в памяти активное мероприятие (с программой) и клавиатуры без перезагрузки
+SNAPSHOT_TTL = env.int('SNAPSHOT_TTL', 30)
+
+# Рассылки: общий лимит сообщений в секунду (у Telegram около 30), потоки отправки,
+# повторы при сетевых ошибках и частота обновления прогресса для организатора
+BROADCAST_RATE = env.float('BROADCAST_RATE', 25)
+BROADCAST_WORKERS = env.int('BROADCAST_WORKERS', 8)
+BROADCAST_MAX_RETRIES = env.int('BROADCAST_MAX_RETRIES', 3)
+BROADCAST_PROGRESS_INTERVAL = env.int('BROADCAST_PROGRESS_INTERVAL', 3)
+# Через сколько секунд без продления аренды рассылку (или отправку вопроса спикеру)
+# может продолжить другой процесс; с той же частотой бот ищет брошенные
+DELIVERY_LEASE_TIMEOUT = env.int('DELIVERY_LEASE_TIMEOUT', 60)
+
+# Сколько похожих анкет хранится для каждого участника и как часто (в секундах)
+# рекомендации пересобираются целиком
+RECOMMENDATIONS_PER_PARTICIPANT = env.int('RECOMMENDATIONS_PER_PARTICIPANT', 50)
+RECOMMENDATIONS_REBUILD_INTERVAL = env.int('RECOMMENDATIONS_REBUILD_INTERVAL', 24 * 60 * 60)
+
+# Потоки, отправляющие спикерам сохранённые вопросы
+QUESTION_DELIVERY_WORKERS = env.int('QUESTION_DELIVERY_WORKERS', 4)
+
+# Через сколько секунд после последнего сохранения мероприятия или его слотов
+# подписчикам уходит анонс (чтобы в нём была вся программа); с той же частотой
+# бот проверяет, не пора ли разослать назначенные анонсы
+NEW_EVENT_NOTIFY_DELAY = env.int('NEW_EVENT_NOTIFY_DELAY', 5)
+
+# Как часто (в секундах) изменённые состояния диалогов и user_data записываются в базу
+PERSISTENCE_FLUSH_INTERVAL = env.float('PERSISTENCE_FLUSH_INTERVAL', 2)
@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.urls import path
 
+from events_bot.webhook import telegram_webhook, yookassa_webhook
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('telegram-webhook/', telegram_webhook, name='telegram_webhook'),
+    path('yookassa-webhook/', yookassa_webhook, name='yookassa_webhook'),
 ]